@@ -324,6 +324,77 @@ class PersistentCache:
                 self.logger.error(f"Error putting to persistent cache: {e}")
                 return False
     
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several items from persistent cache over one connection"""
+        found = {}
+        with self.lock:
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    cursor = conn.cursor()
+                    now = datetime.now()
+                    expired_keys = []
+                    
+                    # Stay under SQLite's bound-parameter limit
+                    for i in range(0, len(keys), 500):
+                        batch = keys[i:i + 500]
+                        placeholders = ','.join(['?' for _ in batch])
+                        cursor.execute(
+                            f"SELECT key, data, created_at, ttl_seconds FROM cache_entries WHERE key IN ({placeholders})",
+                            batch
+                        )
+                        for key, data_blob, created_at_str, ttl_seconds in cursor.fetchall():
+                            created_at = datetime.fromisoformat(created_at_str)
+                            if ttl_seconds > 0 and now > (created_at + timedelta(seconds=ttl_seconds)):
+                                expired_keys.append(key)
+                            else:
+                                found[key] = pickle.loads(data_blob)
+                    
+                    if expired_keys:
+                        cursor.executemany("DELETE FROM cache_entries WHERE key = ?",
+                                           [(key,) for key in expired_keys])
+                    if found:
+                        cursor.executemany(
+                            "UPDATE cache_entries SET accessed_at = ?, access_count = access_count + 1 WHERE key = ?",
+                            [(now.isoformat(), key) for key in found]
+                        )
+            
+            except Exception as e:
+                self.logger.error(f"Error getting from persistent cache: {e}")
+                found = {}
+            
+            for _ in range(len(found)):
+                self.stats.record_hit()
+            for _ in range(len(keys) - len(found)):
+                self.stats.record_miss()
+            return found
+    
+    def put_many(self, items: Dict[str, Any], ttl_seconds: int = 86400,
+                 version: str = "1.0", tags: List[str] = None) -> bool:
+        """Put several items in persistent cache in one transaction"""
+        with self.lock:
+            try:
+                now = datetime.now().isoformat()
+                tags_str = json.dumps(tags or [])
+                rows = []
+                for key, data in items.items():
+                    data_blob = pickle.dumps(data)
+                    rows.append((key, data_blob, now, now, 1, len(data_blob), ttl_seconds, version, tags_str))
+                
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO cache_entries
+                        (key, data, created_at, accessed_at, access_count, size_bytes, ttl_seconds, version, tags)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+                
+                for row in rows:
+                    self.stats.record_storage(row[5])
+                return True
+            
+            except Exception as e:
+                self.logger.error(f"Error putting to persistent cache: {e}")
+                return False
+    
     def clear(self):
         """Clear all entries from persistent cache"""
         with self.lock:
@@ -391,6 +462,7 @@ class CacheManager:
             'embeddings': {'ttl': 3600 * 24 * 7, 'memory': True, 'persistent': True},  # 7 days
             'summaries': {'ttl': 3600 * 2, 'memory': True, 'persistent': True},  # 2 hours
             'search_results': {'ttl': 3600, 'memory': True, 'persistent': False},  # 1 hour, memory only
+            'categories': {'ttl': 3600 * 24 * 30, 'memory': False, 'persistent': True},  # 30 days, categorizer keeps its own LRU
         }
         
         self.logger = logging.getLogger(__name__)
@@ -461,15 +533,15 @@ class CacheManager:
         key = f"embeddings_{text_hash}"
         config = self.cache_configs['embeddings']
         
-        # Convert numpy array to list for serialization
-        embeddings_list = embeddings.tolist() if isinstance(embeddings, np.ndarray) else embeddings
+        # Store float32 arrays; they pickle to a quarter of a list of floats
+        embeddings = np.asarray(embeddings, dtype=np.float32)
         
         success = True
         if config['memory']:
-            success &= self.memory_cache.put(key, embeddings_list, config['ttl'], tags=['embeddings'])
+            success &= self.memory_cache.put(key, embeddings, config['ttl'], tags=['embeddings'])
         
         if config['persistent']:
-            success &= self.persistent_cache.put(key, embeddings_list, config['ttl'], tags=['embeddings'])
+            success &= self.persistent_cache.put(key, embeddings, config['ttl'], tags=['embeddings'])
         
         return success
     
@@ -478,19 +550,68 @@ class CacheManager:
         key = f"embeddings_{text_hash}"
         
         # Try memory cache first
-        embeddings_list = self.memory_cache.get(key)
-        if embeddings_list is not None:
-            return np.array(embeddings_list)
+        embeddings = self.memory_cache.get(key)
+        if embeddings is not None:
+            return np.asarray(embeddings, dtype=np.float32)
         
         # Try persistent cache
-        embeddings_list = self.persistent_cache.get(key)
-        if embeddings_list is not None:
+        embeddings = self.persistent_cache.get(key)
+        if embeddings is not None:
             # Store in memory cache
-            self.memory_cache.put(key, embeddings_list, self.cache_configs['embeddings']['ttl'])
-            return np.array(embeddings_list)
+            self.memory_cache.put(key, embeddings, self.cache_configs['embeddings']['ttl'])
+            return np.asarray(embeddings, dtype=np.float32)
         
         return None
     
+    def cache_embeddings_batch(self, embeddings: Dict[str, np.ndarray]) -> bool:
+        """Cache embeddings for many texts, keyed by text hash"""
+        return self._put_batch('embeddings', 'embeddings', {
+            text_hash: np.asarray(vector, dtype=np.float32) for text_hash, vector in embeddings.items()
+        })
+    
+    def get_embeddings_batch(self, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Get cached embeddings for whichever of the text hashes are present"""
+        found = self._get_batch('embeddings', 'embeddings', text_hashes)
+        return {text_hash: np.asarray(vector, dtype=np.float32) for text_hash, vector in found.items()}
+    
+    def _put_batch(self, cache_type: str, prefix: str, items: Dict[str, Any]) -> bool:
+        """Store many items of one cache type, keyed "<prefix>_<id>"; one sqlite transaction"""
+        config = self.cache_configs[cache_type]
+        keyed = {f"{prefix}_{item_id}": data for item_id, data in items.items()}
+        
+        success = True
+        if config['memory']:
+            for key, data in keyed.items():
+                success &= self.memory_cache.put(key, data, config['ttl'], tags=[cache_type])
+        
+        if config['persistent']:
+            success &= self.persistent_cache.put_many(keyed, config['ttl'], tags=[cache_type])
+        
+        return success
+    
+    def _get_batch(self, cache_type: str, prefix: str, item_ids: List[str]) -> Dict[str, Any]:
+        """Get whichever of many items of one cache type are cached, keyed by id"""
+        config = self.cache_configs[cache_type]
+        found = {}
+        
+        # Try memory cache first
+        if config['memory']:
+            for item_id in item_ids:
+                data = self.memory_cache.get(f"{prefix}_{item_id}")
+                if data is not None:
+                    found[item_id] = data
+        
+        # Fetch the rest from the persistent cache in one query
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing and config['persistent']:
+            stored = self.persistent_cache.get_many([f"{prefix}_{item_id}" for item_id in missing])
+            for key, data in stored.items():
+                found[key[len(prefix) + 1:]] = data
+                if config['memory']:
+                    self.memory_cache.put(key, data, config['ttl'])
+        
+        return found
+    
     def cache_summary(self, document_hash: str, summary: Dict, version: str = "1.0") -> bool:
         """Cache RAG summary"""
         key = f"summary_{document_hash}_{version}"
@@ -537,6 +658,14 @@ class CacheManager:
         key = f"search_{query_hash}"
         return self.memory_cache.get(key)
     
+    def cache_categories(self, results: Dict[str, List[Tuple[str, float]]]) -> bool:
+        """Cache categorization results keyed by fact content hash"""
+        return self._put_batch('categories', 'categories', results)
+    
+    def get_categories(self, content_hashes: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """Get cached categorization results for the given fact content hashes"""
+        return self._get_batch('categories', 'categories', content_hashes)
+    
     def invalidate_document(self, document_hash: str):
         """Invalidate all cache entries for a document"""
         # Clear from memory cache
@@ -3,25 +3,36 @@ Chunked Document Processor - Handles large OCR documents by processing in chunks
 """
 
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 import re
 from pdf_processor import PDFProcessor
 from llm_client import LLMClient
+from smart_chunker import SmartChunker
+from token_budget import get_token_estimator, get_chunk_token_budget
 
 class ChunkedDocumentProcessor:
-    def __init__(self, chunk_size: int = 20000, overlap: int = 500):
+    def __init__(self, chunk_size: int = 20000, overlap: int = 500,
+                 max_chunk_tokens: Optional[int] = None):
         """
         Initialize chunked processor
         
         Args:
-            chunk_size: Maximum characters per chunk
+            chunk_size: Maximum characters per chunk (only used when token
+                        budgeting is disabled with max_chunk_tokens=0)
             overlap: Number of characters to overlap between chunks
+            max_chunk_tokens: Token budget per chunk prompt (default: the
+                              budget for the LLM client's model)
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
         self.llm_client = LLMClient()
         
+        if max_chunk_tokens is None:
+            max_chunk_tokens = get_chunk_token_budget(self.llm_client.model)
+        self.max_chunk_tokens = max_chunk_tokens
+        self.estimate_tokens = get_token_estimator(self.llm_client.model)
+        
     def process_large_document(self, pdf_path: str) -> Dict:
         """
         Process a large document by chunking it intelligently
@@ -40,7 +51,14 @@ class ChunkedDocumentProcessor:
         print(f"📄 Total pages: {len(pages)}")
         
         # Check if chunking is needed
-        if total_chars <= self.chunk_size:
+        if self.max_chunk_tokens:
+            total_tokens = self.estimate_tokens(full_text)
+            print(f"📊 Estimated tokens: {total_tokens:,} (budget {self.max_chunk_tokens:,} per chunk)")
+            fits_single_chunk = total_tokens <= self.max_chunk_tokens
+        else:
+            fits_single_chunk = total_chars <= self.chunk_size
+        
+        if fits_single_chunk:
             print("✅ Document fits in single chunk - using standard processing")
             return self._process_single_chunk(full_text, pages, pdf_path)
         
@@ -73,60 +91,26 @@ class ChunkedDocumentProcessor:
     
     def _create_smart_chunks(self, pages: List[Dict]) -> List[Dict]:
         """
-        Create intelligent chunks that respect page boundaries
+        Create intelligent chunks that respect section and page boundaries.
+        With a token budget every chunk fits the model's prompt budget, so no
+        text has to be cut off when the chunk is sent.
         """
-        chunks = []
-        current_chunk = {
-            'text': '',
-            'pages': [],
-            'start_page': None,
-            'end_page': None
-        }
-        
-        for page in pages:
-            page_text = page.get('text', '')
-            page_num = page.get('page_number', 0)
-            
-            # Check if adding this page would exceed chunk size
-            if len(current_chunk['text']) + len(page_text) > self.chunk_size and current_chunk['text']:
-                # Save current chunk
-                chunks.append(current_chunk)
-                
-                # Start new chunk with overlap from previous page
-                overlap_text = self._get_overlap_text(current_chunk['text'])
-                current_chunk = {
-                    'text': overlap_text + page_text,
-                    'pages': [page_num],
-                    'start_page': page_num,
-                    'end_page': page_num
-                }
-            else:
-                # Add to current chunk
-                current_chunk['text'] += f"\n[Page {page_num}]\n{page_text}\n"
-                current_chunk['pages'].append(page_num)
-                if current_chunk['start_page'] is None:
-                    current_chunk['start_page'] = page_num
-                current_chunk['end_page'] = page_num
+        chunker = SmartChunker(
+            max_chunk_size=self.chunk_size,
+            overlap_size=self.overlap,
+            max_chunk_tokens=self.max_chunk_tokens or None,
+            token_estimator=self.estimate_tokens
+        )
         
-        # Add final chunk
-        if current_chunk['text']:
-            chunks.append(current_chunk)
-        
-        return chunks
-    
-    def _get_overlap_text(self, text: str) -> str:
-        """Get overlap text from the end of a chunk"""
-        if len(text) <= self.overlap:
-            return text
-        
-        # Try to find a sentence boundary
-        overlap_start = len(text) - self.overlap
-        sentence_end = text.rfind('.', overlap_start)
-        
-        if sentence_end > overlap_start - 200:  # Within reasonable distance
-            return text[sentence_end + 1:].strip() + "\n"
-        
-        return text[-self.overlap:].strip() + "\n"
+        return [
+            {
+                'text': chunk.text,
+                'pages': chunk.pages,
+                'start_page': chunk.start_page,
+                'end_page': chunk.end_page
+            }
+            for chunk in chunker.chunk_document(pages)
+        ]
     
     def _process_chunk(self, chunk: Dict, chunk_num: int, total_chunks: int) -> Dict:
         """Process a single chunk"""
@@ -162,7 +146,7 @@ Return JSON in this format:
 }}
 
 DOCUMENT CHUNK:
-{chunk['text'][:15000]}  # Limit chunk size sent to LLM
+{chunk['text']}
 """
         
         try:
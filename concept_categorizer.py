@@ -3,9 +3,40 @@ Concept Categorizer - Classify facts into semantic categories
 """
 
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass
-from semantic_extractor import Fact
+import numpy as np
+from semantic_extractor import Fact, required_literals, CASEFOLD_EXCEPTIONS
+
+# Minimum score for a category to apply to a fact, and categories kept per fact
+CATEGORY_SCORE_THRESHOLD = 0.1
+MAX_CATEGORIES_PER_FACT = 3
+
+# Categories that feed each summary section
+SECTION_CATEGORIES = {
+    'essential_info': [
+        'trust_creation', 'grantor_settlor', 'trustee_appointment', 
+        'beneficiary_designation'
+    ],
+    'how_it_works': [
+        'trustee_powers', 'administrative_provisions', 
+        'amendment_modification', 'withdrawal_rights'
+    ],
+    'important_provisions': [
+        'spendthrift_protection', 'tax_provisions', 
+        'special_provisions', 'termination_conditions'
+    ],
+    'distributions': [
+        'distribution_rules', 'distribution_timing', 
+        'beneficiary_designation', 'withdrawal_rights'
+    ]
+}
+
+# Categorization results held in memory, shared by every categorizer in the process
+CATEGORY_CACHE_SIZE = 50000
 
 
 @dataclass 
@@ -17,6 +48,9 @@ class ConceptCategory:
     patterns: List[str]
     importance: float  # 0.0 to 1.0
     
+    def __post_init__(self):
+        self.compiled_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+    
     def matches(self, text: str) -> float:
         """Calculate match score for text against this category"""
         text_lower = text.lower()
@@ -28,23 +62,207 @@ class ConceptCategory:
             score += (keyword_matches / len(self.keywords)) * 0.5
         
         # Check patterns
-        pattern_matches = sum(1 for pattern in self.patterns 
-                            if re.search(pattern, text, re.IGNORECASE))
+        pattern_matches = sum(1 for pattern in self.compiled_patterns if pattern.search(text))
         if self.patterns:
             score += (pattern_matches / len(self.patterns)) * 0.5
         
         return score * self.importance
 
 
+@dataclass
+class SectionAssignment:
+    """Facts routed to each summary section, with per-fact importance"""
+    sections: Dict[str, List[Fact]]  # section -> facts, in input order
+    importance: List[float]  # parallel to the input facts
+    
+    def important_facts(self, facts: List[Fact], threshold: float = 0.7) -> List[Tuple[Fact, float]]:
+        """(fact, importance) pairs above threshold, most important first"""
+        ranked = [(fact, score) for fact, score in zip(facts, self.importance) if score > threshold]
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked
+
+
+class CategoryMatcher:
+    """
+    Every category's keyword and pattern tests, compiled once.
+    
+    One pass per text records which keywords, and which words the patterns
+    require, occur in it. Matrix products turn that into per-category keyword
+    counts and into the (text, pattern) pairs worth searching, since most
+    texts lack a word most patterns need. A whole batch of texts is scored
+    into a texts x categories matrix that is identical to calling
+    ConceptCategory.matches for each pair.
+    """
+    
+    def __init__(self, categories: List[ConceptCategory]):
+        self.categories = categories
+        
+        vocabulary, pattern_index = {}, {}
+        keyword_links, pattern_links = [], []
+        for c, category in enumerate(categories):
+            for keyword in category.keywords:
+                keyword_links.append((vocabulary.setdefault(keyword.lower(), len(vocabulary)), c))
+            for pattern in category.patterns:
+                pattern_links.append((pattern_index.setdefault(pattern, len(pattern_index)), c))
+        
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in pattern_index]
+        
+        # Each pattern needs one word from every one of its groups
+        group_links, group_patterns = [], []
+        for p, pattern in enumerate(pattern_index):
+            for alternatives, _ in required_literals(pattern):
+                group_patterns.append(p)
+                group_links.extend((vocabulary.setdefault(word, len(vocabulary)), len(group_patterns) - 1)
+                                   for word in alternatives)
+        
+        self.vocabulary = list(vocabulary)
+        self.word_groups = np.zeros((len(self.vocabulary), len(group_patterns)))
+        for w, g in group_links:
+            self.word_groups[w, g] = 1
+        self.group_patterns = np.zeros((len(group_patterns), len(self.patterns)))
+        for g, p in enumerate(group_patterns):
+            self.group_patterns[g, p] = 1
+        self.groups_per_pattern = self.group_patterns.sum(axis=0)
+        
+        # How many times each keyword/pattern counts towards each category
+        self.keyword_weights = np.zeros((len(self.vocabulary), len(categories)))
+        for k, c in keyword_links:
+            self.keyword_weights[k, c] += 1
+        self.pattern_weights = np.zeros((len(self.patterns), len(categories)))
+        for p, c in pattern_links:
+            self.pattern_weights[p, c] += 1
+        
+        self.keyword_counts = np.array([len(category.keywords) for category in categories], dtype=float)
+        self.pattern_counts = np.array([len(category.patterns) for category in categories], dtype=float)
+        self.importance = np.array([category.importance for category in categories], dtype=float)
+    
+    def score(self, texts: List[str]) -> np.ndarray:
+        """
+        Score texts against every category
+        
+        Args:
+            texts: Texts to score
+        
+        Returns:
+            Array of shape (len(texts), len(categories))
+        """
+        present = np.zeros((len(texts), len(self.vocabulary)))
+        for i, text in enumerate(texts):
+            text_lower = text.lower()
+            present[i] = [word in text_lower for word in self.vocabulary]
+        
+        # Search a pattern only where every word group it needs is present.
+        # The word check is only safe when lowercasing agrees with re.IGNORECASE
+        groups_present = (present @ self.word_groups) > 0
+        candidates = (groups_present @ self.group_patterns) == self.groups_per_pattern
+        for i, text in enumerate(texts):
+            if any(char in text for char in CASEFOLD_EXCEPTIONS):
+                candidates[i] = True
+        
+        pattern_hits = np.zeros((len(texts), len(self.patterns)))
+        for i, p in zip(*np.nonzero(candidates)):
+            pattern_hits[i, p] = self.patterns[p].search(texts[i]) is not None
+        
+        # Same operations, in the same order, as ConceptCategory.matches
+        keyword_scores = np.zeros((len(texts), len(self.categories)))
+        has_keywords = self.keyword_counts > 0
+        keyword_scores[:, has_keywords] = \
+            ((present @ self.keyword_weights)[:, has_keywords] / self.keyword_counts[has_keywords]) * 0.5
+        
+        pattern_scores = np.zeros((len(texts), len(self.categories)))
+        has_patterns = self.pattern_counts > 0
+        pattern_scores[:, has_patterns] = \
+            ((pattern_hits @ self.pattern_weights)[:, has_patterns] / self.pattern_counts[has_patterns]) * 0.5
+        
+        return (keyword_scores + pattern_scores) * self.importance
+
+
+class CategorizationCache:
+    """
+    Size-bounded LRU of categorization results keyed by fact content.
+    
+    Keys hash the fact text together with the category-set version, so a
+    re-extracted document (fresh fact_ids, same text) hits the cache while
+    edited category definitions never see stale results.
+    """
+    
+    def __init__(self, max_size: int = CATEGORY_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """Cached results for whichever keys are present"""
+        found = {}
+        with self.lock:
+            for key in keys:
+                categories = self.entries.get(key)
+                if categories is not None:
+                    self.entries.move_to_end(key)
+                    found[key] = categories
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+    
+    def put_many(self, results: Dict[str, List[Tuple[str, float]]]):
+        """Store results, evicting the least recently used beyond max_size"""
+        with self.lock:
+            for key, categories in results.items():
+                self.entries[key] = categories
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached result"""
+        with self.lock:
+            self.entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss counts and current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / max(1, self.hits + self.misses),
+            'entries': len(self.entries),
+            'max_size': self.max_size
+        }
+
+
+# Shared by the processor, the generator and the convenience functions
+shared_category_cache = CategorizationCache()
+
+
 class ConceptCategorizer:
     """Categorize facts and text into semantic concepts"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[CategorizationCache] = None, cache_manager=None):
+        """
+        Initialize categorizer
+        
+        Args:
+            cache: In-memory result cache; defaults to the process-wide one
+            cache_manager: Optional CacheManager that persists results across runs
+        """
         # Define trust document concept categories
         self.categories = self._initialize_categories()
+        self.category_names = [category.name for category in self.categories]
+        self.matcher = CategoryMatcher(self.categories)
+        self.category_version = self._category_set_version()
+        self.category_importance = {cat.name: cat.importance for cat in self.categories}
+        self.category_sections = {}
+        for section, names in SECTION_CATEGORIES.items():
+            for name in names:
+                self.category_sections.setdefault(name, []).append(section)
         
         # Cache for categorization results
-        self.category_cache = {}
+        self.category_cache = cache if cache is not None else shared_category_cache
+        self.cache_manager = cache_manager
     
     def _initialize_categories(self) -> List[ConceptCategory]:
         """Initialize concept categories for trust documents"""
@@ -216,43 +434,91 @@ class ConceptCategorizer:
             )
         ]
     
-    def categorize_fact(self, fact: Fact) -> List[Tuple[str, float]]:
+    def _category_set_version(self) -> str:
+        """Hash of everything that determines a categorization result"""
+        definition = repr([(cat.name, cat.keywords, cat.patterns, cat.importance) for cat in self.categories])
+        definition += f"|{CATEGORY_SCORE_THRESHOLD}|{MAX_CATEGORIES_PER_FACT}"
+        return hashlib.md5(definition.encode()).hexdigest()[:8]
+    
+    def _content_key(self, fact: Fact) -> str:
+        """Cache key for a fact: its scored text and type under this category set"""
+        content = f"{self.category_version}\x00{fact.fact_type}\x00{fact.fact}\x00{fact.context}"
+        return hashlib.md5(content.encode()).hexdigest()
+    
+    def score_matrix(self, facts: List[Fact]) -> np.ndarray:
         """
-        Categorize a single fact into concepts
+        Score facts against every category in one batch
         
         Args:
-            fact: Fact to categorize
+            facts: Facts to score
         
         Returns:
-            List of (category_name, confidence) tuples
+            Array of shape (len(facts), len(self.categories)); columns follow
+            self.category_names
+        """
+        scores = self.matcher.score([f"{fact.fact} {fact.context}" for fact in facts])
+        
+        # Boost score if fact_type matches category name
+        boosted = np.array([[bool(fact.fact_type) and name in fact.fact_type for name in self.category_names]
+                            for fact in facts], dtype=bool).reshape(scores.shape)
+        return np.where(boosted, np.minimum(1.0, scores + 0.3), scores)
+    
+    def _top_categories(self, scores: np.ndarray) -> List[Tuple[str, float]]:
+        """Relevant categories for one row of the score matrix, best first"""
+        relevant = [(self.category_names[c], float(scores[c]))
+                    for c in np.flatnonzero(scores > CATEGORY_SCORE_THRESHOLD)]
+        relevant.sort(key=lambda x: x[1], reverse=True)
+        return relevant[:MAX_CATEGORIES_PER_FACT]
+    
+    def categorize_batch(self, facts: List[Fact]) -> List[List[Tuple[str, float]]]:
         """
-        # Check cache
-        cache_key = fact.fact_id
-        if cache_key in self.category_cache:
-            return self.category_cache[cache_key]
+        Categorize facts in one batch, scoring only those not already cached
         
-        # Calculate scores for each category
-        scores = []
-        text_to_check = f"{fact.fact} {fact.context}"
+        Args:
+            facts: Facts to categorize
         
-        for category in self.categories:
-            score = category.matches(text_to_check)
-            
-            # Boost score if fact_type matches category name
-            if fact.fact_type and category.name in fact.fact_type:
-                score = min(1.0, score + 0.3)
+        Returns:
+            (category_name, confidence) tuples for each fact, in fact order
+        """
+        keys = [self._content_key(fact) for fact in facts]
+        unique_keys = list(dict.fromkeys(keys))
+        found = self.category_cache.get_many(unique_keys)
+        
+        # Results persisted by an earlier run
+        missing = [key for key in unique_keys if key not in found]
+        if missing and self.cache_manager is not None:
+            stored = self.cache_manager.get_categories(missing)
+            if stored:
+                self.category_cache.put_many(stored)
+                found.update(stored)
+                missing = [key for key in missing if key not in found]
+        
+        if missing:
+            pending = {}
+            for key, fact in zip(keys, facts):
+                if key not in found and key not in pending:
+                    pending[key] = fact
             
-            if score > 0.1:  # Threshold for relevance
-                scores.append((category.name, score))
+            scores = self.score_matrix(list(pending.values()))
+            results = {key: self._top_categories(row) for key, row in zip(pending, scores)}
+            self.category_cache.put_many(results)
+            if self.cache_manager is not None:
+                self.cache_manager.cache_categories(results)
+            found.update(results)
         
-        # Sort by score and take top categories
-        scores.sort(key=lambda x: x[1], reverse=True)
-        result = scores[:3]  # Return top 3 categories
+        return [found[key] for key in keys]
+    
+    def categorize_fact(self, fact: Fact) -> List[Tuple[str, float]]:
+        """
+        Categorize a single fact into concepts
         
-        # Cache result
-        self.category_cache[cache_key] = result
+        Args:
+            fact: Fact to categorize
         
-        return result
+        Returns:
+            List of (category_name, confidence) tuples
+        """
+        return self.categorize_batch([fact])[0]
     
     def categorize_facts(self, facts: List[Fact]) -> Dict[str, List[Fact]]:
         """
@@ -267,9 +533,7 @@ class ConceptCategorizer:
         categorized = {cat.name: [] for cat in self.categories}
         categorized['uncategorized'] = []
         
-        for fact in facts:
-            categories = self.categorize_fact(fact)
-            
+        for fact, categories in zip(facts, self.categorize_batch(facts)):
             if categories:
                 # Add to primary category (highest score)
                 primary_category = categories[0][0]
@@ -282,10 +546,7 @@ class ConceptCategorizer:
     
     def get_category_importance(self, category_name: str) -> float:
         """Get importance score for a category"""
-        for cat in self.categories:
-            if cat.name == category_name:
-                return cat.importance
-        return 0.5  # Default importance
+        return self.category_importance.get(category_name, 0.5)  # Default importance
     
     def get_categories_for_section(self, section_type: str) -> List[str]:
         """
@@ -297,26 +558,7 @@ class ConceptCategorizer:
         Returns:
             List of relevant category names
         """
-        section_categories = {
-            'essential_info': [
-                'trust_creation', 'grantor_settlor', 'trustee_appointment', 
-                'beneficiary_designation'
-            ],
-            'how_it_works': [
-                'trustee_powers', 'administrative_provisions', 
-                'amendment_modification', 'withdrawal_rights'
-            ],
-            'important_provisions': [
-                'spendthrift_protection', 'tax_provisions', 
-                'special_provisions', 'termination_conditions'
-            ],
-            'distributions': [
-                'distribution_rules', 'distribution_timing', 
-                'beneficiary_designation', 'withdrawal_rights'
-            ]
-        }
-        
-        return section_categories.get(section_type, [])
+        return list(SECTION_CATEGORIES.get(section_type, []))
     
     def filter_facts_by_section(self, facts: List[Fact], 
                                section_type: str) -> List[Fact]:
@@ -333,8 +575,7 @@ class ConceptCategorizer:
         relevant_categories = set(self.get_categories_for_section(section_type))
         filtered = []
         
-        for fact in facts:
-            categories = self.categorize_fact(fact)
+        for fact, categories in zip(facts, self.categorize_batch(facts)):
             if any(cat[0] in relevant_categories for cat in categories):
                 filtered.append(fact)
         
@@ -350,32 +591,62 @@ class ConceptCategorizer:
         Returns:
             Importance score (0.0 to 1.0)
         """
-        categories = self.categorize_fact(fact)
-        
+        return self._importance(fact, self.categorize_fact(fact))
+    
+    def _importance(self, fact: Fact, categories: List[Tuple[str, float]]) -> float:
+        """get_fact_importance for a fact whose categories are already known"""
         if not categories:
             return fact.confidence * 0.5
         
         # Use highest category score weighted by category importance
         max_score = 0.0
         for cat_name, cat_score in categories:
-            cat_importance = self.get_category_importance(cat_name)
-            weighted_score = cat_score * cat_importance
+            weighted_score = cat_score * self.category_importance.get(cat_name, 0.5)
             max_score = max(max_score, weighted_score)
         
         # Combine with fact confidence
         return (max_score + fact.confidence) / 2
     
-    def get_category_summary(self, facts: List[Fact]) -> Dict[str, Dict]:
+    def assign_sections(self, facts: List[Fact]) -> SectionAssignment:
+        """
+        Route facts to summary sections and score their importance in one pass
+        
+        Args:
+            facts: Facts, typically already ranked by the extractor
+        
+        Returns:
+            SectionAssignment; each section lists its facts in input order, as
+            filter_facts_by_section would, and importance matches
+            get_fact_importance for every fact
+        """
+        sections = {section: [] for section in SECTION_CATEGORIES}
+        importance = []
+        
+        for fact, categories in zip(facts, self.categorize_batch(facts)):
+            importance.append(self._importance(fact, categories))
+            
+            matched = set()
+            for cat_name, _ in categories:
+                matched.update(self.category_sections.get(cat_name, ()))
+            for section in matched:
+                sections[section].append(fact)
+        
+        return SectionAssignment(sections=sections, importance=importance)
+    
+    def get_category_summary(self, facts: List[Fact],
+                             categorized: Optional[Dict[str, List[Fact]]] = None) -> Dict[str, Dict]:
         """
         Generate summary statistics for categorized facts
         
         Args:
             facts: List of facts
+            categorized: categorize_facts() output for these facts, if already computed
         
         Returns:
             Dictionary with category statistics
         """
-        categorized = self.categorize_facts(facts)
+        if categorized is None:
+            categorized = self.categorize_facts(facts)
         summary = {}
         
         for cat_name, cat_facts in categorized.items():
@@ -4,53 +4,493 @@ OCR Cache Manager - Stores OCR results to avoid re-processing
 
 import os
 import json
+import base64
 import hashlib
+import mmap
+import sqlite3
+import struct
+import threading
+import zlib
 from pathlib import Path
-from datetime import datetime
+from contextlib import closing
+from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Read size used when a file can't be memory-mapped for hashing
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Disk budget for cache entries when none is passed in (unset = unbounded)
+DEFAULT_MAX_CACHE_MB = os.getenv('OCR_CACHE_MAX_MB')
+
+# Seconds a writer waits for another process's lock on the index database
+INDEX_DB_TIMEOUT = 30
+
+# Compact cache entry layout:
+#   preamble (magic, version, codec, header length)
+#   JSON header (document metadata + per-page metadata without text)
+#   offset table (offset, length) per blob, relative to the start of the blob data
+#   blobs: each page's text compressed on its own, so single pages can be read,
+#          then full_text (only if stored) and serialized word boxes (version 2)
+CACHE_FORMAT_MAGIC = b"OCRC"
+CACHE_FORMAT_VERSION = 2
+_READABLE_FORMAT_VERSIONS = (1, 2)
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+_PREAMBLE = struct.Struct("<4sBBI")
+_OFFSET_ENTRY = struct.Struct("<QI")
+
+
+def _build_full_text(pages: List[Dict]) -> str:
+    """Rebuild the full document text from its pages"""
+    return "\n".join(f"[Page {p['page_number']}]\n{p['text']}\n" for p in pages)
+
+
+def _full_text_length(pages: List[Dict]) -> int:
+    """len(_build_full_text(pages)) without building the string"""
+    if not pages:
+        return 0
+    return sum(len(f"[Page {p['page_number']}]\n") + len(p['text']) + 2 for p in pages) - 1
+
+
 class OCRCacheManager:
-    def __init__(self, cache_dir: str = "ocr_cache"):
-        """Initialize OCR cache manager with cache directory"""
+    def __init__(self, cache_dir: str = "ocr_cache", compression: str = "auto",
+                 max_cache_mb: Optional[float] = None):
+        """
+        Initialize OCR cache manager with cache directory
+        
+        Args:
+            cache_dir: Directory holding cache entries and the index
+            compression: 'zstd', 'zlib', 'none', or 'auto' (zstd when the
+                         zstandard package is installed, zlib otherwise)
+            max_cache_mb: Disk budget for cache entries; least recently used
+                          entries are evicted when a save goes over it
+                          (default: OCR_CACHE_MAX_MB env var, else unbounded)
+        """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.index_file = self.cache_dir / "index.json"
-        self.index = self._load_index()
+        self.codec = self._resolve_codec(compression)
+        if max_cache_mb is None and DEFAULT_MAX_CACHE_MB:
+            max_cache_mb = float(DEFAULT_MAX_CACHE_MB)
+        self.max_cache_mb = max_cache_mb
+        
+        # Index and hash memo live in SQLite (WAL mode) so concurrent processes
+        # can read and update single entries without rewriting a shared file
+        self.index_db = self.cache_dir / "index.db"
+        self._init_database()
+        self._migrate_json_index()
+        self._backfill_entry_sizes()
+        
+        # Per-page results of OCR runs that have not finished yet
+        self.pages_dir = self.cache_dir / "pages"
+        self.pages_dir.mkdir(exist_ok=True)
+        self._pages_lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the index database"""
+        return sqlite3.connect(self.index_db, timeout=INDEX_DB_TIMEOUT)
     
-    def _load_index(self) -> Dict:
-        """Load the cache index"""
-        if self.index_file.exists():
-            with open(self.index_file, 'r') as f:
-                return json.load(f)
-        return {}
+    def _init_database(self):
+        """Create the index tables"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ocr_index (
+                    file_hash TEXT PRIMARY KEY,
+                    pdf_path TEXT,
+                    pdf_name TEXT,
+                    file_size INTEGER,
+                    file_modified TEXT,
+                    processed_date TEXT,
+                    page_count INTEGER,
+                    total_chars INTEGER,
+                    cache_file TEXT,
+                    size_bytes INTEGER,
+                    last_accessed TEXT,
+                    access_count INTEGER DEFAULT 0
+                )
+            """)
+            # Index databases created before eviction was added lack the access columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ocr_index)")}
+            for column, column_type in (('size_bytes', 'INTEGER'),
+                                        ('last_accessed', 'TEXT'),
+                                        ('access_count', 'INTEGER DEFAULT 0')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE ocr_index ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON ocr_index(last_accessed)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS hash_memo (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    inode INTEGER,
+                    sha256 TEXT
+                )
+            """)
+    
+    def _migrate_json_index(self):
+        """Import index.json / hash_memo.json from older cache directories"""
+        index_file = self.cache_dir / "index.json"
+        if index_file.exists():
+            try:
+                with open(index_file, 'r') as f:
+                    index = json.load(f)
+                for file_hash, info in index.items():
+                    self._put_index_entry(file_hash, info, replace=False)
+                os.replace(index_file, index_file.with_suffix('.json.migrated'))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Error migrating cache index: {e}")
+        
+        hash_memo_file = self.cache_dir / "hash_memo.json"
+        if hash_memo_file.exists():
+            try:
+                with open(hash_memo_file, 'r') as f:
+                    hash_memo = json.load(f)
+                with closing(self._connect()) as conn, conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO hash_memo VALUES (?, ?, ?, ?, ?)",
+                        [(path, e['fingerprint']['size'], e['fingerprint']['mtime_ns'],
+                          e['fingerprint']['inode'], e['sha256'])
+                         for path, e in hash_memo.items()]
+                    )
+                hash_memo_file.unlink()
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                print(f"Error migrating hash memo: {e}")
     
-    def _save_index(self):
-        """Save the cache index"""
-        with open(self.index_file, 'w') as f:
-            json.dump(self.index, f, indent=2)
+    def _backfill_entry_sizes(self):
+        """Record on-disk sizes for entries indexed before sizes were tracked"""
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT file_hash, cache_file FROM ocr_index WHERE size_bytes IS NULL"
+            ).fetchall()
+            for file_hash, cache_file in rows:
+                cache_path = self.cache_dir / cache_file if cache_file else None
+                size = cache_path.stat().st_size if cache_path and cache_path.exists() else 0
+                conn.execute("UPDATE ocr_index SET size_bytes = ? WHERE file_hash = ?", (size, file_hash))
+    
+    def _get_index_entry(self, file_hash: str) -> Optional[Dict]:
+        """Look up one document in the index"""
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                "SELECT * FROM ocr_index WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def _get_index_entries(self) -> List[Dict]:
+        """All documents in the index"""
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM ocr_index ORDER BY processed_date").fetchall()
+        return [dict(row) for row in rows]
+    
+    def _put_index_entry(self, file_hash: str, info: Dict, replace: bool = True):
+        """Insert (or replace) one document's index entry atomically"""
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"""{verb} INTO ocr_index (file_hash, pdf_path, pdf_name, file_size,
+                        file_modified, processed_date, page_count, total_chars, cache_file,
+                        size_bytes, last_accessed, access_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (file_hash, info.get('pdf_path'), info.get('pdf_name'), info.get('file_size'),
+                 info.get('file_modified'), info.get('processed_date'), info.get('page_count', 0),
+                 info.get('total_chars', 0), info.get('cache_file'), info.get('size_bytes'),
+                 info.get('last_accessed', info.get('processed_date')), info.get('access_count', 0))
+            )
+    
+    def _touch_index_entry(self, file_hash: str):
+        """Record a cache hit for eviction ordering"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    """UPDATE ocr_index SET last_accessed = ?, access_count = access_count + 1
+                       WHERE file_hash = ?""",
+                    (datetime.now().isoformat(), file_hash)
+                )
+        except sqlite3.Error as e:
+            print(f"Error updating cache access time: {e}")
+    
+    def _get_file_fingerprint(self, file_path: str) -> Dict:
+        """Cheap stat-based fingerprint of a file (size, mtime, inode)"""
+        file_stats = os.stat(file_path)
+        return {
+            'size': file_stats.st_size,
+            'mtime_ns': file_stats.st_mtime_ns,
+            'inode': file_stats.st_ino
+        }
     
     def _get_file_hash(self, file_path: str) -> str:
-        """Generate hash of file for cache key"""
+        """
+        Generate hash of file for cache key. The SHA-256 is only computed when
+        the file's path, size, mtime or inode changed since it was last hashed.
+        """
+        memo_key = str(Path(file_path).absolute())
+        fingerprint = self._get_file_fingerprint(file_path)
+        
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, sha256 FROM hash_memo WHERE path = ?", (memo_key,)
+            ).fetchone()
+        if row and row[:3] == (fingerprint['size'], fingerprint['mtime_ns'], fingerprint['inode']):
+            return row[3]
+        
+        file_hash = self._compute_file_hash(file_path)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO hash_memo VALUES (?, ?, ?, ?, ?)",
+                    (memo_key, fingerprint['size'], fingerprint['mtime_ns'], fingerprint['inode'], file_hash)
+                )
+        except sqlite3.Error as e:
+            print(f"Error saving hash memo: {e}")
+        return file_hash
+    
+    def _compute_file_hash(self, file_path: str) -> str:
+        """SHA-256 of the file contents, memory-mapped where possible"""
         sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    sha256_hash.update(mapped)
+            except (ValueError, OSError):
+                # Empty files and some filesystems can't be mapped
+                for byte_block in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                    sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
     
+    def _resolve_codec(self, compression: str) -> int:
+        """Map a compression setting to a codec id"""
+        if compression == "auto":
+            return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        if compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd compression requires the 'zstandard' package")
+            return CODEC_ZSTD
+        if compression == "zlib":
+            return CODEC_ZLIB
+        if compression == "none":
+            return CODEC_NONE
+        raise ValueError(f"Unknown compression: {compression}")
+    
+    def _compress(self, data: bytes, codec: int) -> bytes:
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        if codec == CODEC_ZLIB:
+            return zlib.compress(data, 6)
+        return data
+    
+    def _decompress(self, data: bytes, codec: int) -> bytes:
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ImportError("Cache entry is zstd-compressed but 'zstandard' is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(data)
+        return data
+    
     def _get_cache_path(self, file_hash: str) -> Path:
         """Get cache file path for given hash"""
+        return self.cache_dir / f"{file_hash}.ocr"
+    
+    def _get_legacy_cache_path(self, file_hash: str) -> Path:
+        """Get path of a pre-compact-format JSON entry"""
         return self.cache_dir / f"{file_hash}.json"
     
+    def _resolve_cache_path(self, file_hash: str) -> Optional[Path]:
+        """Get the compact entry for a hash, migrating a legacy JSON entry on first access"""
+        cache_path = self._get_cache_path(file_hash)
+        if cache_path.exists():
+            return cache_path
+        
+        if self._get_legacy_cache_path(file_hash).exists() and self._migrate_legacy_entry(file_hash):
+            return cache_path
+        
+        return None
+    
+    def _write_entry(self, cache_path: Path, metadata: Dict, full_text: Optional[str], pages: List[Dict],
+                     word_boxes: Optional[Dict[int, bytes]] = None):
+        """
+        Write a compact cache entry (to a temp file, then renamed into place).
+        A full_text of None stands for the [Page n] reconstruction of the pages.
+        """
+        blobs = [self._compress(page.get('text', '').encode('utf-8'), self.codec) for page in pages]
+        
+        header = dict(metadata)
+        header['pages'] = [{k: v for k, v in page.items() if k != 'text'} for page in pages]
+        # full_text is normally rebuilt from the pages; only store it if it differs
+        header['full_text_stored'] = full_text is not None and full_text != _build_full_text(pages)
+        if header['full_text_stored']:
+            blobs.append(self._compress(full_text.encode('utf-8'), self.codec))
+        
+        # Word boxes are opaque bytes keyed by page number
+        word_boxes = word_boxes or {}
+        header['word_box_pages'] = sorted(word_boxes)
+        for page_number in header['word_box_pages']:
+            blobs.append(self._compress(word_boxes[page_number], self.codec))
+        
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        
+        offset_table = bytearray()
+        offset = 0
+        for blob in blobs:
+            offset_table += _OFFSET_ENTRY.pack(offset, len(blob))
+            offset += len(blob)
+        
+        # Per-process temp name so concurrent writers of the same entry don't collide
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREAMBLE.pack(CACHE_FORMAT_MAGIC, CACHE_FORMAT_VERSION, self.codec, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(offset_table)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, cache_path)
+    
+    def _read_entry_header(self, f) -> Tuple[int, Dict, List[Tuple[int, int]], int]:
+        """Read preamble, header and offset table; returns (codec, header, offsets, data_start)"""
+        magic, version, codec, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != CACHE_FORMAT_MAGIC or version not in _READABLE_FORMAT_VERSIONS:
+            raise ValueError("Unrecognized OCR cache entry format")
+        
+        header = json.loads(f.read(header_length))
+        blob_count = (len(header['pages']) + (1 if header.get('full_text_stored') else 0)
+                      + len(header.get('word_box_pages', [])))
+        table = f.read(_OFFSET_ENTRY.size * blob_count)
+        offsets = list(_OFFSET_ENTRY.iter_unpack(table))
+        
+        return codec, header, offsets, f.tell()
+    
+    def _read_entry(self, cache_path: Path) -> Tuple[Dict, Optional[str], List[Dict]]:
+        """
+        Read a whole compact entry; returns (header, full_text, pages), with
+        full_text None when it is just the [Page n] reconstruction of the pages
+        """
+        with open(cache_path, 'rb') as f:
+            codec, header, offsets, _ = self._read_entry_header(f)
+            data = memoryview(f.read())
+        
+        text_count = len(header['pages']) + (1 if header.get('full_text_stored') else 0)
+        texts = [
+            self._decompress(data[offset:offset + length], codec).decode('utf-8')
+            for offset, length in offsets[:text_count]
+        ]
+        
+        pages = []
+        for page_meta, text in zip(header['pages'], texts):
+            page = dict(page_meta)
+            page['text'] = text
+            pages.append(page)
+        
+        full_text = texts[-1] if header.get('full_text_stored') else None
+        return header, full_text, pages
+    
+    def _migrate_legacy_entry(self, file_hash: str) -> bool:
+        """Convert a legacy indented-JSON entry to the compact format"""
+        legacy_path = self._get_legacy_cache_path(file_hash)
+        try:
+            with open(legacy_path, 'r') as f:
+                data = json.load(f)
+            
+            metadata = {k: v for k, v in data.items() if k not in ('full_text', 'pages')}
+            cache_path = self._get_cache_path(file_hash)
+            self._write_entry(cache_path, metadata, data['full_text'], data['pages'])
+            # Another process may be migrating the same entry
+            legacy_path.unlink(missing_ok=True)
+            
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "UPDATE ocr_index SET cache_file = ?, size_bytes = ? WHERE file_hash = ?",
+                    (cache_path.name, cache_path.stat().st_size, file_hash)
+                )
+            return True
+            
+        except Exception as e:
+            # A concurrent migration may have finished the job for us
+            if self._get_cache_path(file_hash).exists():
+                return True
+            print(f"Error migrating legacy cache entry {legacy_path.name}: {e}")
+            return False
+    
+    def migrate_legacy_entries(self) -> int:
+        """Convert every legacy JSON entry in the cache; returns number migrated"""
+        migrated = 0
+        for entry in self._get_index_entries():
+            file_hash = entry['file_hash']
+            if (self._get_legacy_cache_path(file_hash).exists()
+                    and not self._get_cache_path(file_hash).exists()
+                    and self._migrate_legacy_entry(file_hash)):
+                migrated += 1
+        return migrated
+    
+    def _get_pages_path(self, file_hash: str, ocr_config: str) -> Path:
+        """Get page journal path for given hash and OCR configuration"""
+        config_key = hashlib.md5(ocr_config.encode()).hexdigest()[:8]
+        return self.pages_dir / f"{file_hash}_{config_key}.jsonl"
+    
+    def get_cached_pages(self, file_hash: str, ocr_config: str) -> Dict[int, Dict]:
+        """
+        Load pages already OCR'd for this file and OCR configuration,
+        keyed by zero-based page index. Used to resume interrupted runs.
+        """
+        pages_path = self._get_pages_path(file_hash, ocr_config)
+        cached_pages = {}
+        
+        if not pages_path.exists():
+            return cached_pages
+        
+        try:
+            with open(pages_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from an interrupted write
+                        continue
+                    page = entry['page']
+                    if 'word_boxes' in page:
+                        page['word_boxes'] = base64.b64decode(page['word_boxes'])
+                    cached_pages[entry['page_index']] = page
+        except Exception as e:
+            print(f"Error loading cached pages: {e}")
+        
+        return cached_pages
+    
+    def save_page_result(self, file_hash: str, ocr_config: str, page_index: int, page: Dict):
+        """Append a single OCR'd page to the page journal as soon as it is done"""
+        try:
+            pages_path = self._get_pages_path(file_hash, ocr_config)
+            if isinstance(page.get('word_boxes'), bytes):
+                page = dict(page, word_boxes=base64.b64encode(page['word_boxes']).decode('ascii'))
+            line = json.dumps({'page_index': page_index, 'page': page})
+            
+            with self._pages_lock:
+                with open(pages_path, 'a') as f:
+                    f.write(line + "\n")
+                    f.flush()
+                    
+        except Exception as e:
+            print(f"Error saving page to cache: {e}")
+    
+    def clear_cached_pages(self, file_hash: str):
+        """Remove page journals for a file (all OCR configurations)"""
+        for pages_path in self.pages_dir.glob(f"{file_hash}_*.jsonl"):
+            pages_path.unlink(missing_ok=True)
+    
     def has_cached_ocr(self, pdf_path: str) -> bool:
         """Check if OCR results exist for this PDF"""
         try:
             file_hash = self._get_file_hash(pdf_path)
-            cache_path = self._get_cache_path(file_hash)
             
             # Check if cache file exists and is in index
-            if cache_path.exists() and file_hash in self.index:
+            stored_info = self._get_index_entry(file_hash)
+            if stored_info and self._resolve_cache_path(file_hash):
                 # Verify file hasn't changed
-                stored_info = self.index[file_hash]
                 file_stats = os.stat(pdf_path)
                 
                 # Check if file size matches
@@ -64,18 +504,27 @@ class OCRCacheManager:
             print(f"Error checking cache: {e}")
             return False
     
-    def get_cached_ocr(self, pdf_path: str) -> Optional[Tuple[str, List[Dict]]]:
-        """Retrieve cached OCR results"""
+    def get_cached_ocr(self, pdf_path: str,
+                       build_full_text: bool = True) -> Optional[Tuple[Optional[str], List[Dict]]]:
+        """
+        Retrieve cached OCR results as (full_text, pages). With
+        build_full_text=False, full_text is None unless the entry stored a
+        text that differs from the [Page n] reconstruction of its pages.
+        """
         try:
             file_hash = self._get_file_hash(pdf_path)
-            cache_path = self._get_cache_path(file_hash)
+            cache_path = self._resolve_cache_path(file_hash)
             
-            if cache_path.exists():
-                with open(cache_path, 'r') as f:
-                    data = json.load(f)
+            if cache_path:
+                _, full_text, pages = self._read_entry(cache_path)
+                self._touch_index_entry(file_hash)
                 
-                print(f"✓ Loaded cached OCR: {len(data['pages'])} pages, {len(data['full_text'])} chars")
-                return data['full_text'], data['pages']
+                total_chars = len(full_text) if full_text is not None else _full_text_length(pages)
+                if full_text is None and build_full_text:
+                    full_text = _build_full_text(pages)
+                
+                print(f"✓ Loaded cached OCR: {len(pages)} pages, {total_chars} chars")
+                return full_text, pages
             
             return None
             
@@ -83,74 +532,266 @@ class OCRCacheManager:
             print(f"Error loading cache: {e}")
             return None
     
-    def save_ocr_results(self, pdf_path: str, full_text: str, pages: List[Dict]):
-        """Save OCR results to cache"""
+    def get_cached_page(self, pdf_path: str, page_number: int) -> Optional[Dict]:
+        """Retrieve a single cached page without loading the rest of the document"""
         try:
+            file_hash = self._get_file_hash(pdf_path)
+            cache_path = self._resolve_cache_path(file_hash)
+            
+            if not cache_path:
+                return None
+            
+            with open(cache_path, 'rb') as f:
+                codec, header, offsets, data_start = self._read_entry_header(f)
+                
+                for i, page_meta in enumerate(header['pages']):
+                    if page_meta.get('page_number') == page_number:
+                        offset, length = offsets[i]
+                        f.seek(data_start + offset)
+                        page = dict(page_meta)
+                        page['text'] = self._decompress(f.read(length), codec).decode('utf-8')
+                        self._touch_index_entry(file_hash)
+                        return page
+            
+            return None
+            
+        except Exception as e:
+            print(f"Error loading cached page: {e}")
+            return None
+    
+    def get_cached_word_boxes(self, pdf_path: str, page_number: int) -> Optional[bytes]:
+        """Retrieve the serialized word boxes of one cached page, if it has any"""
+        try:
+            file_hash = self._get_file_hash(pdf_path)
+            cache_path = self._resolve_cache_path(file_hash)
+            
+            if not cache_path:
+                return None
+            
+            with open(cache_path, 'rb') as f:
+                codec, header, offsets, data_start = self._read_entry_header(f)
+                word_box_pages = header.get('word_box_pages', [])
+                if page_number not in word_box_pages:
+                    return None
+                
+                blob_index = (len(header['pages']) + (1 if header.get('full_text_stored') else 0)
+                              + word_box_pages.index(page_number))
+                offset, length = offsets[blob_index]
+                f.seek(data_start + offset)
+                return self._decompress(f.read(length), codec)
+            
+        except Exception as e:
+            print(f"Error loading cached word boxes: {e}")
+            return None
+    
+    def save_ocr_results(self, pdf_path: str, full_text: Optional[str], pages: List[Dict],
+                         word_boxes: Optional[Dict[int, bytes]] = None):
+        """
+        Save OCR results to cache, with optional serialized word boxes keyed by
+        page number. Pass full_text=None when it is the [Page n] reconstruction
+        of the pages, so it never has to be built.
+        """
+        try:
+            total_chars = len(full_text) if full_text is not None else _full_text_length(pages)
             file_hash = self._get_file_hash(pdf_path)
             cache_path = self._get_cache_path(file_hash)
             file_stats = os.stat(pdf_path)
             
             # Save OCR data
-            cache_data = {
+            metadata = {
                 'pdf_path': str(Path(pdf_path).absolute()),
                 'pdf_name': Path(pdf_path).name,
                 'processed_date': datetime.now().isoformat(),
                 'page_count': len(pages),
-                'total_chars': len(full_text),
-                'full_text': full_text,
-                'pages': pages
+                'total_chars': total_chars
             }
             
-            with open(cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            self._write_entry(cache_path, metadata, full_text, pages, word_boxes)
             
             # Update index
-            self.index[file_hash] = {
-                'pdf_path': str(Path(pdf_path).absolute()),
-                'pdf_name': Path(pdf_path).name,
+            self._put_index_entry(file_hash, {
+                'pdf_path': metadata['pdf_path'],
+                'pdf_name': metadata['pdf_name'],
                 'file_size': file_stats.st_size,
                 'file_modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
-                'processed_date': cache_data['processed_date'],
+                'processed_date': metadata['processed_date'],
                 'page_count': len(pages),
-                'total_chars': len(full_text),
-                'cache_file': str(cache_path.name)
-            }
+                'total_chars': total_chars,
+                'cache_file': str(cache_path.name),
+                'size_bytes': cache_path.stat().st_size,
+                'last_accessed': metadata['processed_date'],
+                'access_count': 0
+            })
             
-            self._save_index()
+            # The complete entry supersedes any partial page results
+            self.clear_cached_pages(file_hash)
             print(f"✓ Cached OCR results: {Path(pdf_path).name} ({len(pages)} pages)")
             
+            if self.max_cache_mb is not None:
+                self.prune(self.max_cache_mb, keep=[file_hash])
+            
         except Exception as e:
             print(f"Error saving cache: {e}")
     
     def get_cache_stats(self) -> Dict:
         """Get statistics about the cache"""
+        with closing(self._connect()) as conn:
+            total_documents, total_pages, total_chars, total_bytes = conn.execute(
+                """SELECT COUNT(*), COALESCE(SUM(page_count), 0), COALESCE(SUM(total_chars), 0),
+                          COALESCE(SUM(size_bytes), 0)
+                   FROM ocr_index"""
+            ).fetchone()
+            documents = conn.execute(
+                """SELECT pdf_name, page_count, processed_date, last_accessed, access_count
+                   FROM ocr_index ORDER BY processed_date"""
+            ).fetchall()
+        
         stats = {
-            'total_documents': len(self.index),
-            'total_pages': sum(info['page_count'] for info in self.index.values()),
-            'total_chars': sum(info['total_chars'] for info in self.index.values()),
-            'cache_size_mb': sum(
-                (self.cache_dir / info['cache_file']).stat().st_size 
-                for info in self.index.values() 
-                if (self.cache_dir / info['cache_file']).exists()
-            ) / (1024 * 1024),
+            'total_documents': total_documents,
+            'total_pages': total_pages,
+            'total_chars': total_chars,
+            'cache_size_mb': total_bytes / (1024 * 1024),
+            'max_cache_mb': self.max_cache_mb,
             'documents': [
                 {
-                    'name': info['pdf_name'],
-                    'pages': info['page_count'],
-                    'processed': info['processed_date']
+                    'name': name,
+                    'pages': page_count,
+                    'processed': processed_date,
+                    'last_accessed': last_accessed,
+                    'access_count': access_count
                 }
-                for info in self.index.values()
+                for name, page_count, processed_date, last_accessed, access_count in documents
             ]
         }
         return stats
     
+    def _remove_entry(self, file_hash: str):
+        """Delete one document's cache files, page journals and index row"""
+        for cache_path in (self._get_cache_path(file_hash), self._get_legacy_cache_path(file_hash)):
+            # Tolerate another process removing the same entry concurrently
+            cache_path.unlink(missing_ok=True)
+        self.clear_cached_pages(file_hash)
+        
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM ocr_index WHERE file_hash = ?", (file_hash,))
+    
+    def prune(self, max_cache_mb: Optional[float] = None, policy: str = "lru",
+              older_than_days: Optional[float] = None, keep: List[str] = None) -> Dict:
+        """
+        Evict cache entries until the cache fits the disk budget
+        
+        Args:
+            max_cache_mb: Budget to shrink to (default: the manager's max_cache_mb)
+            policy: 'lru' evicts least recently accessed entries first,
+                    'lfu' least frequently accessed (ties by recency)
+            older_than_days: Also evict every entry not accessed for this long
+            keep: File hashes that must not be evicted
+        
+        Returns:
+            Dictionary with number of entries removed and MB freed
+        """
+        if max_cache_mb is None:
+            max_cache_mb = self.max_cache_mb
+        
+        order = {
+            'lru': "COALESCE(last_accessed, processed_date) ASC",
+            'lfu': "access_count ASC, COALESCE(last_accessed, processed_date) ASC"
+        }
+        if policy not in order:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""SELECT file_hash, COALESCE(size_bytes, 0), COALESCE(last_accessed, processed_date)
+                    FROM ocr_index ORDER BY {order[policy]}"""
+            ).fetchall()
+        
+        keep = set(keep or [])
+        total_bytes = sum(size for _, size, _ in rows)
+        budget_bytes = max_cache_mb * 1024 * 1024 if max_cache_mb is not None else None
+        cutoff = None
+        if older_than_days is not None:
+            cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        
+        removed = 0
+        freed_bytes = 0
+        for file_hash, size, last_accessed in rows:
+            if file_hash in keep:
+                continue
+            over_budget = budget_bytes is not None and total_bytes > budget_bytes
+            stale = cutoff is not None and (last_accessed or '') < cutoff
+            if not (over_budget or stale):
+                # Rows are in eviction order, but stale entries can still follow
+                if cutoff is None:
+                    break
+                continue
+            
+            self._remove_entry(file_hash)
+            total_bytes -= size
+            freed_bytes += size
+            removed += 1
+        
+        if removed:
+            print(f"✓ Evicted {removed} OCR cache entries ({freed_bytes / (1024 * 1024):.2f} MB)")
+        
+        return {'removed': removed, 'freed_mb': freed_bytes / (1024 * 1024)}
+    
     def clear_cache(self):
         """Clear all cached OCR results"""
-        for file_hash in self.index:
-            cache_path = self._get_cache_path(file_hash)
-            if cache_path.exists():
-                cache_path.unlink()
+        for entry in self._get_index_entries():
+            file_hash = entry['file_hash']
+            for cache_path in (self._get_cache_path(file_hash), self._get_legacy_cache_path(file_hash)):
+                if cache_path.exists():
+                    cache_path.unlink()
         
-        self.index = {}
-        self._save_index()
-        print("✓ OCR cache cleared")
\ No newline at end of file
+        for pages_path in self.pages_dir.glob("*.jsonl"):
+            pages_path.unlink()
+        
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM ocr_index")
+        print("✓ OCR cache cleared")
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Inspect and prune the OCR cache')
+    parser.add_argument('--cache-dir', default='ocr_cache', help='OCR cache directory (default: ocr_cache)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    subparsers.add_parser('stats', help='Show cache size and documents')
+    
+    prune_parser = subparsers.add_parser('prune', help='Evict entries to fit a disk budget')
+    prune_parser.add_argument('--max-mb', type=float, help='Disk budget in MB (default: OCR_CACHE_MAX_MB)')
+    prune_parser.add_argument('--policy', choices=['lru', 'lfu'], default='lru',
+                              help='Eviction order (default: lru)')
+    prune_parser.add_argument('--older-than-days', type=float,
+                              help='Also evict entries not accessed for this many days')
+    
+    subparsers.add_parser('clear', help='Remove every cache entry')
+    
+    args = parser.parse_args()
+    cache_manager = OCRCacheManager(args.cache_dir)
+    
+    if args.command == 'stats':
+        stats = cache_manager.get_cache_stats()
+        budget = f" / {stats['max_cache_mb']:.1f} MB" if stats['max_cache_mb'] is not None else ""
+        print(f"Documents: {stats['total_documents']}")
+        print(f"Pages: {stats['total_pages']}")
+        print(f"Size: {stats['cache_size_mb']:.2f} MB{budget}")
+        for doc in stats['documents']:
+            print(f"  - {doc['name']}: {doc['pages']} pages, "
+                  f"last accessed {doc['last_accessed']}, {doc['access_count']} hits")
+    
+    elif args.command == 'prune':
+        if args.max_mb is None and cache_manager.max_cache_mb is None and args.older_than_days is None:
+            parser.error("prune needs --max-mb, --older-than-days or OCR_CACHE_MAX_MB")
+        result = cache_manager.prune(args.max_mb, policy=args.policy, older_than_days=args.older_than_days)
+        print(f"Removed {result['removed']} entries, freed {result['freed_mb']:.2f} MB")
+    
+    elif args.command == 'clear':
+        cache_manager.clear_cache()
+
+
+if __name__ == "__main__":
+    main()
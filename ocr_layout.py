@@ -0,0 +1,83 @@
+"""
+OCR Layout - Compact word bounding boxes for OCR'd pages
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import List, Tuple, Iterator
+
+# Word count, followed by start offsets, end offsets and (x0, y0, x1, y1) boxes
+_HEADER = struct.Struct("<I")
+
+
+class WordBoxes:
+    """
+    Word bounding boxes for one page, kept in flat arrays rather than a
+    dict per word. Offsets index into the page's text; boxes are in PDF
+    points with the origin at the top-left corner of the page.
+    """
+
+    def __init__(self, starts: array = None, ends: array = None, boxes: array = None):
+        self.starts = starts if starts is not None else array('I')
+        self.ends = ends if ends is not None else array('I')
+        self.boxes = boxes if boxes is not None else array('f')
+
+    def add(self, start: int, end: int, box: Tuple[float, float, float, float]):
+        """Append a word; words must be added in text order"""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.boxes.extend(box)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, Tuple[float, float, float, float]]]:
+        for i in range(len(self.starts)):
+            yield self.starts[i], self.ends[i], self.get_box(i)
+
+    def get_box(self, word_index: int) -> Tuple[float, float, float, float]:
+        """Box of the i-th word as (x0, y0, x1, y1)"""
+        return tuple(self.boxes[word_index * 4:word_index * 4 + 4])
+
+    def word_at(self, char_offset: int) -> int:
+        """Index of the word containing char_offset, or -1 if it falls between words"""
+        i = bisect_right(self.starts, char_offset) - 1
+        if i >= 0 and char_offset < self.ends[i]:
+            return i
+        return -1
+
+    def boxes_for_span(self, start: int, end: int) -> List[Tuple[float, float, float, float]]:
+        """Boxes of every word overlapping the text span [start, end)"""
+        first = max(bisect_right(self.starts, start) - 1, 0)
+        if first < len(self.ends) and self.ends[first] <= start:
+            first += 1
+        last = bisect_right(self.starts, end - 1) if end > start else first
+        return [self.get_box(i) for i in range(first, last)]
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact little-endian byte string"""
+        parts = [self.starts, self.ends, self.boxes]
+        if sys.byteorder == 'big':
+            parts = [array(part.typecode, part) for part in parts]
+            for part in parts:
+                part.byteswap()
+        return _HEADER.pack(len(self.starts)) + b"".join(part.tobytes() for part in parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'WordBoxes':
+        """Rebuild from to_bytes() output"""
+        (count,) = _HEADER.unpack_from(data)
+        starts, ends, boxes = array('I'), array('I'), array('f')
+
+        offset = _HEADER.size
+        for part, length in ((starts, count), (ends, count), (boxes, count * 4)):
+            size = length * part.itemsize
+            part.frombytes(data[offset:offset + size])
+            offset += size
+
+        if sys.byteorder == 'big':
+            for part in (starts, ends, boxes):
+                part.byteswap()
+        return cls(starts, ends, boxes)
@@ -1,142 +1,529 @@
 import pdfplumber
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator, Optional
 from pathlib import Path
 import pypdfium2 as pdfium
 from PIL import Image
 import pytesseract
 import io
+import math
+import re
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 from ocr_cache_manager import OCRCacheManager
+from ocr_layout import WordBoxes
+
+# Render scales tried in order (scale 1.0 = 72 DPI): pages are OCR'd at the
+# lowest scale first and re-OCR'd higher only if Tesseract's confidence is poor
+OCR_RENDER_SCALES = (2.0, 3.0)
+OCR_MIN_CONFIDENCE = 70.0
+OCR_TESSERACT_CONFIG = r'--oem 3 --psm 6'
+
+# Deskew search range and step, in degrees, and the relative improvement in
+# row sharpness a rotation needs over the unrotated page to be applied
+OCR_DESKEW_MAX_ANGLE = 3.0
+OCR_DESKEW_STEP = 0.25
+OCR_DESKEW_MIN_GAIN = 0.05
+
+# Identifies OCR settings in the page cache; change it whenever OCR output would change
+OCR_CACHE_CONFIG = (f"scales={OCR_RENDER_SCALES} min_conf={OCR_MIN_CONFIDENCE} "
+                    f"preprocess=gray,otsu,deskew(min_gain={OCR_DESKEW_MIN_GAIN}) {OCR_TESSERACT_CONFIG}")
+
+# Pages whose text layer has fewer non-whitespace characters are OCR'd
+DEFAULT_OCR_TEXT_THRESHOLD = 50
+
+# Document handle reused across pages inside an OCR worker process
+_worker_document = None
+
+
+def _count_text_layer_chars(page) -> int:
+    """Cheap probe of a pdfium page's embedded text layer (non-whitespace chars)"""
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_bounded()
+    finally:
+        textpage.close()
+    return len("".join(text.split()))
+
+
+def _otsu_threshold(pixels: np.ndarray) -> int:
+    """Otsu's threshold for an 8-bit grayscale image"""
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    total = pixels.size
+    
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    cumulative_mean = np.cumsum(histogram * np.arange(256))
+    mean_background = cumulative_mean / np.maximum(weight_background, 1)
+    mean_foreground = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_foreground, 1)
+    
+    between_class_variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(between_class_variance))
+
+
+def _estimate_skew(binary: Image.Image) -> float:
+    """
+    Estimate page skew in degrees with a projection profile: text rows are
+    sharpest (highest variance of ink per row) when the page is level.
+    Runs on a downsampled copy, so it costs little next to OCR.
+    """
+    sample = binary.copy()
+    sample.thumbnail((800, 800))
+    
+    # Blank page: nothing to level
+    if not (np.asarray(sample) == 0).any():
+        return 0.0
+    
+    def row_sharpness(angle: float) -> float:
+        rotated = sample.rotate(angle, resample=Image.NEAREST, fillcolor=255)
+        return float(np.var((np.asarray(rotated) == 0).sum(axis=1)))
+    
+    # Try angles nearest level first so ties go to the smallest rotation
+    steps = int(round(OCR_DESKEW_MAX_ANGLE / OCR_DESKEW_STEP))
+    level_score = row_sharpness(0.0)
+    best_angle, best_score = 0.0, level_score
+    for step in range(1, steps + 1):
+        for angle in (-step * OCR_DESKEW_STEP, step * OCR_DESKEW_STEP):
+            score = row_sharpness(angle)
+            if score > best_score:
+                best_angle, best_score = angle, score
+    
+    # Only rotate when it clearly beats leaving the page as it is
+    if best_score <= level_score * (1 + OCR_DESKEW_MIN_GAIN):
+        return 0.0
+    return best_angle
+
+
+def _preprocess_for_ocr(image: Image.Image) -> Tuple[Image.Image, float]:
+    """Binarize (Otsu) and deskew a grayscale page image; returns (image, rotation angle)"""
+    pixels = np.asarray(image)
+    threshold = _otsu_threshold(pixels)
+    binary = Image.fromarray(np.where(pixels > threshold, 255, 0).astype(np.uint8))
+    
+    angle = _estimate_skew(binary)
+    if angle:
+        binary = binary.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return binary, angle
+
+
+def _run_tesseract(image: Image.Image) -> Tuple[str, float, List[Tuple[int, int, Tuple[int, int, int, int]]]]:
+    """
+    OCR an image; returns (text, mean word confidence, words), where each word
+    is (start offset in text, end offset, (left, top, width, height) in pixels)
+    """
+    data = pytesseract.image_to_data(image, config=OCR_TESSERACT_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+    
+    # Rebuild the text layout from Tesseract's block/paragraph/line numbering
+    lines = []
+    line_key = None
+    paragraph_key = None
+    confidences = []
+    word_indexes = []
+    for i, word in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not word.strip():
+            continue
+        confidences.append(confidence)
+        
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if key != line_key:
+            if paragraph_key is not None and key[:2] != paragraph_key:
+                lines.append([])
+            lines.append([])
+            line_key, paragraph_key = key, key[:2]
+        lines[-1].append(word)
+        word_indexes.append(i)
+    
+    # Track each word's character offsets while joining, so boxes line up with the text
+    text_parts = []
+    words = []
+    offset = 0
+    word_iter = iter(word_indexes)
+    for line_number, line_words in enumerate(lines):
+        if line_number:
+            text_parts.append("\n")
+            offset += 1
+        for word_number, word in enumerate(line_words):
+            if word_number:
+                text_parts.append(" ")
+                offset += 1
+            i = next(word_iter)
+            words.append((offset, offset + len(word),
+                          (data['left'][i], data['top'][i], data['width'][i], data['height'][i])))
+            text_parts.append(word)
+            offset += len(word)
+    
+    text = "".join(text_parts)
+    mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, mean_confidence, words
+
+
+def _build_word_boxes(words: List, scale: float, angle: float,
+                      source_size: Tuple[int, int], ocr_size: Tuple[int, int]) -> WordBoxes:
+    """Map Tesseract's pixel boxes back through the deskew rotation into PDF points"""
+    cos_angle, sin_angle = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    word_boxes = WordBoxes()
+    
+    for start, end, (left, top, width, height) in words:
+        # Box center relative to the center of the (rotated, expanded) OCR image
+        dx = left + width / 2 - ocr_size[0] / 2
+        dy = top + height / 2 - ocr_size[1] / 2
+        x = dx * cos_angle - dy * sin_angle + source_size[0] / 2
+        y = dx * sin_angle + dy * cos_angle + source_size[1] / 2
+        
+        word_boxes.add(start, end, (
+            (x - width / 2) / scale, (y - height / 2) / scale,
+            (x + width / 2) / scale, (y + height / 2) / scale
+        ))
+    
+    return word_boxes
+
+
+def _ocr_page(page, page_number: int) -> Dict:
+    """
+    Render a single pdfium page in grayscale, clean it up and run Tesseract.
+    The page is re-rendered at the next scale in OCR_RENDER_SCALES only when
+    Tesseract found words but their mean confidence is below OCR_MIN_CONFIDENCE.
+    """
+    started = time.perf_counter()
+    
+    try:
+        best = None
+        for scale in OCR_RENDER_SCALES:
+            bitmap = page.render(scale=scale, grayscale=True)
+            source = bitmap.to_pil()
+            image, angle = _preprocess_for_ocr(source)
+            bitmap.close()
+            
+            text, confidence, words = _run_tesseract(image)
+            if best is None or confidence > best[2]:
+                best = (text, scale, confidence, words, angle, source.size, image.size)
+            # A page with no words (blank) gains nothing from a higher scale
+            if confidence >= OCR_MIN_CONFIDENCE or not words:
+                break
+        
+        text, scale, confidence, words, angle, source_size, ocr_size = best
+        ocr_stats = {
+            'ocr_scale': scale,
+            'ocr_confidence': round(confidence, 1),
+            'ocr_seconds': round(time.perf_counter() - started, 3)
+        }
+        
+        if text and text.strip():
+            word_boxes = _build_word_boxes(words, scale, angle, source_size, ocr_size)
+            return {
+                'page_number': page_number,
+                'text': text,
+                'extraction_method': 'OCR',
+                **ocr_stats,
+                # Serialized WordBoxes; PDFProcessor moves these off the page dict
+                'word_boxes': word_boxes.to_bytes()
+            }
+        
+        # If OCR returns nothing, add a placeholder
+        return {
+            'page_number': page_number,
+            'text': f"[Page {page_number} - No text could be extracted]",
+            'extraction_method': 'OCR_FAILED',
+            **ocr_stats
+        }
+        
+    except Exception as ocr_error:
+        print(f"OCR error on page {page_number}: {ocr_error}")
+        return {
+            'page_number': page_number,
+            'text': f"[Page {page_number} - OCR failed: {str(ocr_error)}]",
+            'extraction_method': 'OCR_ERROR'
+        }
+
+
+def _ocr_improves_on(ocr_data: Dict, text_layer_data: Dict) -> bool:
+    """True if an OCR result should replace a page's short text layer: OCR
+    succeeded and found more (non-whitespace) text"""
+    if ocr_data.get('extraction_method') != 'OCR':
+        return False
+    return len("".join(ocr_data['text'].split())) > len("".join(text_layer_data['text'].split()))
+
+
+def _ocr_page_worker(pdf_path: str, page_index: int) -> Dict:
+    """
+    Process pool entry point: open (or reuse) the PDF inside the worker and
+    OCR one page, so only the extracted text crosses the process boundary.
+    """
+    global _worker_document
+    if _worker_document is None or _worker_document[0] != pdf_path:
+        if _worker_document is not None:
+            _worker_document[1].close()
+        _worker_document = (pdf_path, pdfium.PdfDocument(pdf_path))
+    
+    page = _worker_document[1][page_index]
+    return _ocr_page(page, page_index + 1)
+
 
 class PDFProcessor:
-    def __init__(self, use_cache: bool = True):
+    def __init__(self, use_cache: bool = True, ocr_workers: int = 1,
+                 ocr_text_threshold: int = DEFAULT_OCR_TEXT_THRESHOLD):
+        """
+        Args:
+            use_cache: Whether to use OCR caching
+            ocr_workers: Number of processes used to OCR pages in parallel
+                         (1 keeps OCR in the current process)
+            ocr_text_threshold: Pages whose text layer has fewer characters
+                                than this are OCR'd instead
+        """
         self.pages_content = []
-        self.full_text = ""
+        self.pdf_path = None
+        # Word boxes of OCR'd pages, keyed by page number (loaded lazily from the cache)
+        self.word_boxes: Dict[int, WordBoxes] = {}
         self.use_cache = use_cache
+        self.ocr_workers = max(1, ocr_workers or 1)
+        self.ocr_text_threshold = ocr_text_threshold
         self.cache_manager = OCRCacheManager() if use_cache else None
         
+    @property
+    def pages_content(self) -> List[Dict]:
+        return self._pages_content
+    
+    @pages_content.setter
+    def pages_content(self, pages: List[Dict]):
+        self._pages_content = pages
+        self._full_text = None
+    
+    @property
+    def full_text(self) -> str:
+        """Whole document with [Page n] markers, joined from pages_content on first access"""
+        if self._full_text is None:
+            self._full_text = "\n".join(
+                f"[Page {p['page_number']}]\n{p['text']}\n" for p in self._pages_content
+            )
+        return self._full_text
+    
+    @full_text.setter
+    def full_text(self, text: str):
+        self._full_text = text
+    
     def extract_text_from_pdf(self, pdf_path: str) -> Tuple[str, List[Dict]]:
         """
         Extract text from PDF file with page tracking.
         Handles both text-based and scanned (image-based) PDFs using OCR.
         Returns: (full_text, pages_content)
         """
+        for _ in self.iter_pages(pdf_path):
+            pass
+        return self.full_text, self.pages_content
+    
+    def iter_pages(self, pdf_path: str) -> Iterator[Dict]:
+        """
+        Yield page dictionaries as soon as each page is extracted or OCR'd,
+        so downstream stages can start on page 1 before the whole document
+        is done. Cached documents are served straight from the OCR cache.
+        
+        Once the generator is exhausted, full_text and pages_content are
+        populated and the results are cached, as with extract_text_from_pdf.
+        """
+        self.pdf_path = pdf_path
+        self.word_boxes = {}
+        
         # Check cache first
         if self.use_cache and self.cache_manager:
             if self.cache_manager.has_cached_ocr(pdf_path):
-                cached_result = self.cache_manager.get_cached_ocr(pdf_path)
+                cached_result = self.cache_manager.get_cached_ocr(pdf_path, build_full_text=False)
                 if cached_result:
-                    self.full_text, self.pages_content = cached_result
-                    return self.full_text, self.pages_content
+                    full_text, self.pages_content = cached_result
+                    if full_text is not None:
+                        self.full_text = full_text
+                    yield from self.pages_content
+                    return
         
         pages_content = []
-        full_text_parts = []
+        for page_data in self._iter_extracted_pages(pdf_path):
+            pages_content.append(page_data)
+            yield page_data
         
-        # First try regular text extraction
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                has_text = False
-                
-                for i, page in enumerate(pdf.pages, 1):
-                    text = page.extract_text()
-                    if text and text.strip():
-                        has_text = True
-                        pages_content.append({
-                            'page_number': i,
-                            'text': text
-                        })
-                        full_text_parts.append(f"[Page {i}]\n{text}\n")
-                
-                # If we got text, return it
-                if has_text:
-                    self.pages_content = pages_content
-                    self.full_text = "\n".join(full_text_parts)
-                    # Cache the results
-                    if self.use_cache and self.cache_manager:
-                        self.cache_manager.save_ocr_results(pdf_path, self.full_text, self.pages_content)
-                    return self.full_text, self.pages_content
-                
-        except Exception as e:
-            print(f"Error with pdfplumber: {e}")
+        self.pages_content = pages_content
         
-        # If no text found, use OCR
-        print("No text found in PDF. Using OCR to extract text from images...")
-        return self._extract_text_with_ocr(pdf_path)
+        # Cache the results
+        self._save_complete_entry(pdf_path)
     
-    def _extract_text_with_ocr(self, pdf_path: str) -> Tuple[str, List[Dict]]:
+    def _iter_extracted_pages(self, pdf_path: str, force_ocr: bool = False) -> Iterator[Dict]:
         """
-        Extract text from PDF using OCR (Tesseract).
-        This handles scanned PDFs by converting pages to images and running OCR.
+        Yield pages in order, routing each one individually: pages with a
+        usable text layer are read with pdfplumber, the rest (scanned pages,
+        signature pages, exhibits) are OCR'd. With force_ocr every page is OCR'd.
         """
-        pages_content = []
-        full_text_parts = []
+        executor = None
+        ocr_futures = {}
+        plumber_pdf = None
+        ocr_pages = 0
+        total_text_length = 0
         
+        # Everything after opening runs under the finally below, so a page that
+        # fails the text-layer probe cannot leak the document handle
+        pdf = pdfium.PdfDocument(pdf_path)
         try:
-            # Use pypdfium2 to render pages as images
-            pdf = pdfium.PdfDocument(pdf_path)
             total_pages = len(pdf)
             
-            for i, page in enumerate(pdf, 1):
-                print(f"Processing page {i}/{total_pages} with OCR...")
-                
-                # Render page as high-resolution image for better OCR accuracy
-                # Using scale=3.0 for 300 DPI equivalent
-                bitmap = page.render(scale=3.0)
-                pil_image = bitmap.to_pil()
-                
-                # Run OCR using Tesseract
-                try:
-                    # Configure Tesseract for better accuracy
-                    custom_config = r'--oem 3 --psm 6'
-                    text = pytesseract.image_to_string(pil_image, config=custom_config)
-                    
-                    if text and text.strip():
-                        pages_content.append({
-                            'page_number': i,
-                            'text': text,
-                            'extraction_method': 'OCR'
-                        })
-                        full_text_parts.append(f"[Page {i}]\n{text}\n")
-                    else:
-                        # If OCR returns nothing, add a placeholder
-                        placeholder = f"[Page {i} - No text could be extracted]"
-                        pages_content.append({
-                            'page_number': i,
-                            'text': placeholder,
-                            'extraction_method': 'OCR_FAILED'
-                        })
-                        full_text_parts.append(f"[Page {i}]\n{placeholder}\n")
-                        
-                except Exception as ocr_error:
-                    print(f"OCR error on page {i}: {ocr_error}")
-                    error_text = f"[Page {i} - OCR failed: {str(ocr_error)}]"
-                    pages_content.append({
-                        'page_number': i,
-                        'text': error_text,
-                        'extraction_method': 'OCR_ERROR'
-                    })
-                    full_text_parts.append(f"[Page {i}]\n{error_text}\n")
+            # Probe each page's text layer to decide which ones need OCR. Pages
+            # with a short but real text layer (signature pages) are OCR'd too,
+            # but their text layer is kept unless OCR finds more text
+            short_text_indexes = set()
+            if force_ocr:
+                ocr_indexes = list(range(total_pages))
+            else:
+                ocr_indexes = []
+                for i in range(total_pages):
+                    text_chars = _count_text_layer_chars(pdf[i])
+                    if text_chars < self.ocr_text_threshold:
+                        ocr_indexes.append(i)
+                        if text_chars:
+                            short_text_indexes.add(i)
+            ocr_index_set = set(ocr_indexes)
             
-            self.pages_content = pages_content
-            self.full_text = "\n".join(full_text_parts)
+            if force_ocr:
+                print(f"Using OCR for all {total_pages} pages...")
+            elif ocr_indexes:
+                print(f"Using OCR for {len(ocr_indexes)} of {total_pages} pages without a usable text layer...")
             
-            # Cache the OCR results
-            if self.use_cache and self.cache_manager and self.full_text:
-                self.cache_manager.save_ocr_results(pdf_path, self.full_text, self.pages_content)
+            # Reuse pages OCR'd by an earlier, possibly interrupted, run
+            file_hash = None
+            cached_pages = {}
+            if self.use_cache and self.cache_manager and ocr_indexes:
+                file_hash = self.cache_manager._get_file_hash(pdf_path)
+                cached_pages = self.cache_manager.get_cached_pages(file_hash, OCR_CACHE_CONFIG)
+                resumed = sum(1 for i in ocr_indexes if i in cached_pages)
+                if resumed:
+                    print(f"✓ Resuming OCR: {resumed} of {len(ocr_indexes)} pages already cached")
+            pending_indexes = [i for i in ocr_indexes if i not in cached_pages]
             
-            # Check if we got any meaningful text
-            total_text_length = sum(len(p.get('text', '')) for p in pages_content 
-                                   if p.get('extraction_method') == 'OCR')
+            # Fan OCR pages out to the pool up front; results are collected in page order
+            # but cached as soon as each one completes
+            if self.ocr_workers > 1 and len(pending_indexes) > 1:
+                executor = ProcessPoolExecutor(max_workers=min(self.ocr_workers, len(pending_indexes)))
+                for i in pending_indexes:
+                    future = executor.submit(_ocr_page_worker, pdf_path, i)
+                    future.add_done_callback(
+                        lambda f, page_index=i: self._cache_ocr_page_future(file_hash, page_index, f)
+                    )
+                    ocr_futures[i] = future
             
+            if len(ocr_indexes) < total_pages or short_text_indexes:
+                plumber_pdf = pdfplumber.open(pdf_path)
+            
+            for i in range(total_pages):
+                page_data = None
+                if i not in ocr_index_set:
+                    page_data = self._extract_text_layer_page(plumber_pdf, i)
+                
+                if page_data is None:
+                    if i in cached_pages:
+                        page_data = cached_pages[i]
+                    elif i in ocr_futures:
+                        page_data = ocr_futures[i].result()
+                        print(f"Processed page {i + 1}/{total_pages} with OCR")
+                    else:
+                        print(f"Processing page {i + 1}/{total_pages} with OCR...")
+                        page_data = _ocr_page(pdf[i], i + 1)
+                        self._cache_ocr_page(file_hash, i, page_data)
+                    
+                    ocr_pages += 1
+                    if page_data.get('extraction_method') == 'OCR':
+                        total_text_length += len(page_data.get('text', ''))
+                    
+                    if i in short_text_indexes:
+                        text_layer_page = self._extract_text_layer_page(plumber_pdf, i)
+                        if text_layer_page is not None and not _ocr_improves_on(page_data, text_layer_page):
+                            print(f"Kept the text layer of page {i + 1} over its OCR result")
+                            page_data = text_layer_page
+                    
+                    # Copy rather than pop: a pool done-callback may still be journaling this dict
+                    if 'word_boxes' in page_data:
+                        self.word_boxes[page_data['page_number']] = WordBoxes.from_bytes(page_data['word_boxes'])
+                        page_data = {k: v for k, v in page_data.items() if k != 'word_boxes'}
+                
+                yield page_data
+                
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if plumber_pdf is not None:
+                plumber_pdf.close()
+            pdf.close()
+        
+        # Check if we got any meaningful text
+        if ocr_pages:
             if total_text_length > 100:  # Arbitrary threshold for "meaningful" text
-                print(f"Successfully extracted {total_text_length} characters from {total_pages} pages using OCR")
+                print(f"Successfully extracted {total_text_length} characters from {ocr_pages} pages using OCR")
             else:
                 print(f"Warning: Very little text extracted ({total_text_length} characters). The document may be empty or the scan quality may be poor.")
-            
-            return self.full_text, self.pages_content
-                
+    
+    def _save_complete_entry(self, pdf_path: str):
+        """
+        Save the finished document to the OCR cache. Documents with OCR_ERROR
+        pages are left to the page journal instead, so the next run retries
+        just those pages rather than serving the error placeholder forever.
+        """
+        if not (self.use_cache and self.cache_manager and self.pages_content):
+            return
+        failed = [p['page_number'] for p in self.pages_content if p.get('extraction_method') == 'OCR_ERROR']
+        if failed:
+            print(f"⚠️ Not caching complete OCR results: OCR failed on pages {failed}")
+            return
+        # None unless something has read or set full_text; None means the plain [Page n] join
+        self.cache_manager.save_ocr_results(pdf_path, self._full_text, self.pages_content,
+                                            self._serialized_word_boxes())
+    
+    def _cache_ocr_page(self, file_hash: Optional[str], page_index: int, page_data: Dict):
+        """Persist a finished OCR page so an interrupted run can resume from it"""
+        if file_hash is None or not self.cache_manager:
+            return
+        # Errors are retried on the next run rather than cached
+        if page_data.get('extraction_method') == 'OCR_ERROR':
+            return
+        self.cache_manager.save_page_result(file_hash, OCR_CACHE_CONFIG, page_index, page_data)
+    
+    def _cache_ocr_page_future(self, file_hash: Optional[str], page_index: int, future):
+        """Done-callback for pool OCR futures"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache_ocr_page(file_hash, page_index, future.result())
+    
+    def _extract_text_layer_page(self, plumber_pdf, page_index: int) -> Optional[Dict]:
+        """Extract a page's text layer with pdfplumber; None means fall back to OCR"""
+        try:
+            text = plumber_pdf.pages[page_index].extract_text()
+        except Exception as e:
+            print(f"Error with pdfplumber on page {page_index + 1}: {e}")
+            return None
+        
+        if not text or not text.strip():
+            return None
+        
+        return {
+            'page_number': page_index + 1,
+            'text': text,
+            'extraction_method': 'text'
+        }
+    
+    def _extract_text_with_ocr(self, pdf_path: str) -> Tuple[str, List[Dict]]:
+        """
+        Extract text from PDF using OCR (Tesseract).
+        This handles scanned PDFs by converting pages to images and running OCR.
+        """
+        self.pdf_path = pdf_path
+        self.word_boxes = {}
+        try:
+            pages_content = list(self._iter_extracted_pages(pdf_path, force_ocr=True))
         except Exception as e:
             raise Exception(f"Error processing PDF with OCR: {str(e)}")
+        
+        self.pages_content = pages_content
+        
+        # Cache the OCR results
+        self._save_complete_entry(pdf_path)
+        
+        return self.full_text, self.pages_content
     
     def get_page_count(self) -> int:
         """Get total number of pages"""
@@ -149,6 +536,41 @@ class PDFProcessor:
                 return page['text']
         return ""
     
+    def _serialized_word_boxes(self) -> Dict[int, bytes]:
+        return {page_number: boxes.to_bytes() for page_number, boxes in self.word_boxes.items()}
+    
+    def get_word_boxes(self, page_number: int) -> Optional[WordBoxes]:
+        """
+        Word bounding boxes for an OCR'd page (None for text-layer pages).
+        Offsets index into the page's text, boxes are in PDF points.
+        """
+        if page_number not in self.word_boxes and self.cache_manager and self.pdf_path:
+            data = self.cache_manager.get_cached_word_boxes(self.pdf_path, page_number)
+            if data is not None:
+                self.word_boxes[page_number] = WordBoxes.from_bytes(data)
+        return self.word_boxes.get(page_number)
+    
+    def find_text_boxes(self, page_number: int, text: str) -> List[Tuple[float, float, float, float]]:
+        """
+        Locate text on an OCR'd page and return the boxes of the words it spans,
+        e.g. to highlight a citation. Any run of whitespace in the text matches
+        any run on the page, so citations spanning OCR line breaks still
+        resolve. Empty if the text or the boxes are missing.
+        """
+        tokens = text.split()
+        if not tokens:
+            return []
+        
+        match = re.search(r'\s+'.join(re.escape(token) for token in tokens),
+                          self.get_text_by_page(page_number))
+        if match is None:
+            return []
+        
+        word_boxes = self.get_word_boxes(page_number)
+        if word_boxes is None:
+            return []
+        return word_boxes.boxes_for_span(match.start(), match.end())
+    
     def get_extraction_summary(self) -> Dict:
         """Get summary of extraction methods used"""
         summary = {
@@ -156,10 +578,17 @@ class PDFProcessor:
             'text_pages': 0,
             'ocr_pages': 0,
             'failed_pages': 0,
-            'total_characters': 0
+            'total_characters': 0,
+            'ocr_seconds': 0.0,
+            'mean_ocr_confidence': None
         }
         
+        ocr_confidences = []
         for page in self.pages_content:
+            summary['ocr_seconds'] += page.get('ocr_seconds', 0.0)
+            if 'ocr_confidence' in page:
+                ocr_confidences.append(page['ocr_confidence'])
+            
             method = page.get('extraction_method', 'text')
             text_length = len(page.get('text', ''))
             
@@ -172,4 +601,7 @@ class PDFProcessor:
                 summary['text_pages'] += 1
                 summary['total_characters'] += text_length
         
+        if ocr_confidences:
+            summary['mean_ocr_confidence'] = sum(ocr_confidences) / len(ocr_confidences)
+        
         return summary
\ No newline at end of file
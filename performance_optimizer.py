@@ -24,6 +24,42 @@ from smart_chunker import SmartChunker, DocumentChunk
 from cache_manager import CacheManager
 
 
+# Work items handed to each fact extraction worker, see parallel_fact_extraction
+FACT_BATCHES_PER_WORKER = 4
+
+# Extractor for the current worker process (or for the thread pool)
+_worker_extractor: Optional[SemanticFactExtractor] = None
+
+
+def _init_fact_worker():
+    """Pool initializer: build the extractor and compile its patterns once per worker"""
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = SemanticFactExtractor()
+
+
+def _extract_fact_batch(batch: List[Tuple[str, int, int]]) -> List[Union[List[tuple], str]]:
+    """
+    Extract facts from a batch of (text, start_page, start_char) chunks.
+    
+    Facts are returned as plain field tuples rather than Fact objects, which
+    pickle smaller and faster; a chunk that fails yields its error message.
+    """
+    results = []
+    for text, start_page, start_char in batch:
+        try:
+            facts = _worker_extractor.extract_facts(text, start_page, start_char)
+        except Exception as e:
+            results.append(str(e))
+            continue
+        results.append([
+            (fact.fact, fact.page, fact.char_position, fact.fact_type, fact.confidence,
+             fact.entities, fact.context, fact.fact_id)
+            for fact in facts
+        ])
+    return results
+
+
 @dataclass
 class PerformanceMetrics:
     """Performance tracking metrics"""
@@ -189,35 +225,56 @@ class BatchProcessor:
         self.batch_size = batch_size
         self.logger = logging.getLogger(__name__)
     
-    def parallel_fact_extraction(self, chunks: List[DocumentChunk]) -> List[Fact]:
-        """Extract facts from chunks in parallel"""
+    def parallel_fact_extraction(self, chunks: List[DocumentChunk],
+                                 use_processes: bool = True) -> List[Fact]:
+        """
+        Extract facts from chunks in parallel
+        
+        Args:
+            chunks: Document chunks to extract facts from
+            use_processes: Run extraction in a process pool. Extraction is
+                           pure-Python regex work, so threads are serialized
+                           by the GIL; the thread pool is kept for comparison
+        
+        Returns:
+            Facts in chunk order, then extraction order within each chunk
+        """
         self.logger.info(f"Starting parallel fact extraction for {len(chunks)} chunks")
         
-        def extract_chunk_facts(chunk: DocumentChunk) -> List[Fact]:
-            extractor = SemanticFactExtractor()
-            return extractor.extract_facts(
-                chunk.text,
-                chunk.start_page,
-                chunk.start_char
-            )
+        payloads = [(chunk.text, chunk.start_page, chunk.start_char) for chunk in chunks]
+        
+        # A few batches per worker: large enough to amortize IPC, small enough
+        # to keep workers busy when chunks vary in length
+        batch_count = min(len(payloads), self.max_workers * FACT_BATCHES_PER_WORKER)
+        batch_size = max(1, -(-len(payloads) // max(1, batch_count)))
+        batches = [payloads[i:i + batch_size] for i in range(0, len(payloads), batch_size)]
+        
+        if use_processes and self.max_workers > 1 and len(batches) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches)),
+                                           initializer=_init_fact_worker)
+        else:
+            # Extractors hold no per-call state, so threads can share one
+            _init_fact_worker()
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
         
         all_facts = []
         
-        # Process chunks in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            futures = {
-                executor.submit(extract_chunk_facts, chunk): i 
-                for i, chunk in enumerate(chunks)
-            }
+        with executor:
+            futures = [executor.submit(_extract_fact_batch, batch) for batch in batches]
             
-            # Collect results
-            for future in as_completed(futures):
+            # Collect results in submission order so output is deterministic
+            for batch, future in zip(batches, futures):
                 try:
-                    chunk_facts = future.result()
-                    all_facts.extend(chunk_facts)
+                    batch_results = future.result()
                 except Exception as e:
-                    self.logger.error(f"Error processing chunk: {e}")
+                    self.logger.error(f"Error processing chunk batch: {e}")
+                    continue
+                
+                for chunk_result in batch_results:
+                    if isinstance(chunk_result, str):
+                        self.logger.error(f"Error processing chunk: {chunk_result}")
+                    else:
+                        all_facts.extend(Fact(*row) for row in chunk_result)
         
         self.logger.info(f"Extracted {len(all_facts)} facts from {len(chunks)} chunks")
         return all_facts
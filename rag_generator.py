@@ -7,7 +7,7 @@ from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from semantic_extractor import Fact, SemanticFactExtractor
 from vector_store import DocumentVectorStore
-from concept_categorizer import ConceptCategorizer
+from concept_categorizer import ConceptCategorizer, SectionAssignment
 from smart_chunker import SmartChunker, DocumentChunk
 from llm_client import LLMClient
 
@@ -119,25 +119,23 @@ Use ONLY the provided facts and citations."""
             _, pages = processor.extract_text_from_pdf(pdf_path)
             facts = extractor.extract_from_pages(pages)
         
-        # Index facts in vector store (clear first to avoid duplicates)
+        # Sync this document's facts in the vector store; unchanged facts are
+        # skipped and other documents in the collection are left alone
         doc_id = Path(pdf_path).stem
-        try:
-            # Clear existing facts for this document
-            self.vector_store.clear_collection()
-            self.vector_store = DocumentVectorStore()  # Reinitialize
-        except:
-            pass
-        self.vector_store.index_facts(facts, doc_id)
+        self.vector_store.replace_document_facts(facts, doc_id)
+        
+        # Categorize once for the executive summary and every section
+        assignment = self.categorizer.assign_sections(facts)
         
         # Generate executive summary
-        executive = self._generate_executive_summary(facts)
+        executive = self._generate_executive_summary(facts, assignment)
         
         # Generate each section
         sections = []
         citations = {}
         
         for section_type in ['essential_info', 'how_it_works', 'important_provisions', 'distributions']:
-            section_data = self._generate_section(section_type, facts)
+            section_data = self._generate_section(section_type, facts, assignment, doc_id)
             sections.append(section_data['section'])
             citations.update(section_data['citations'])
         
@@ -158,17 +156,14 @@ Use ONLY the provided facts and citations."""
         
         return summary
     
-    def _generate_executive_summary(self, facts: List[Fact]) -> str:
+    def _generate_executive_summary(self, facts: List[Fact],
+                                    assignment: Optional[SectionAssignment] = None) -> str:
         """Generate executive summary"""
-        # Get most important facts
-        important_facts = []
-        for fact in facts:
-            importance = self.categorizer.get_fact_importance(fact)
-            if importance > 0.7:
-                important_facts.append((fact, importance))
-        
-        # Sort by importance
-        important_facts.sort(key=lambda x: x[1], reverse=True)
+        if assignment is None:
+            assignment = self.categorizer.assign_sections(facts)
+        
+        # Get most important facts, sorted by importance
+        important_facts = assignment.important_facts(facts, threshold=0.7)
         top_facts = [f[0] for f in important_facts[:10]]
         
         # Create prompt
@@ -197,7 +192,9 @@ Keep it concise and factual."""
             # Fallback to simple response
             return "This trust document establishes provisions for the management and distribution of trust assets."
     
-    def _generate_section(self, section_type: str, all_facts: List[Fact]) -> Dict:
+    def _generate_section(self, section_type: str, all_facts: List[Fact],
+                          assignment: Optional[SectionAssignment] = None,
+                          document_id: Optional[str] = None) -> Dict:
         """Generate a specific section with citations"""
         # Retrieve relevant facts
         section_config = self.section_queries[section_type]
@@ -209,7 +206,8 @@ Keep it concise and factual."""
             # Search for relevant facts
             search_results = self.vector_store.semantic_search(
                 section_config['query'],
-                top_k=section_config['top_k']
+                top_k=section_config['top_k'],
+                filters={'document_id': document_id} if document_id else None
             )
             
             # Filter by categories
@@ -233,7 +231,10 @@ Keep it concise and factual."""
                     seen_facts.add(fact_text)
             
             # Also get facts by category
-            category_facts = self.categorizer.filter_facts_by_section(all_facts, section_type)
+            if assignment is not None:
+                category_facts = assignment.sections.get(section_type, [])
+            else:
+                category_facts = self.categorizer.filter_facts_by_section(all_facts, section_type)
             for fact in category_facts[:10]:
                 if fact.fact not in seen_facts:
                     relevant_facts.append(fact)
@@ -180,7 +180,7 @@ class RAGTrustProcessor:
         # Categorize facts
         print("  - Categorizing facts...")
         categorized = self.categorizer.categorize_facts(facts)
-        category_summary = self.categorizer.get_category_summary(facts)
+        category_summary = self.categorizer.get_category_summary(facts, categorized)
         print(f"    Organized into {len(categorized)} categories")
         
         # Generate summary
@@ -197,18 +197,16 @@ class RAGTrustProcessor:
     
     def _process_with_chunking(self, pages: List[Dict], pdf_path: str) -> Dict:
         """Process large document using chunking"""
-        # Create chunks
+        # Create chunks, extracting facts from each one as soon as it is ready
         print("  - Creating semantic chunks...")
-        chunks = self.chunker.chunk_document(pages)
-        print(f"    Created {len(chunks)} chunks")
-        
-        # Process each chunk
         all_facts = []
         chunk_summaries = []
+        chunk_count = 0
         
-        for i, chunk in enumerate(chunks, 1):
-            if i % 10 == 0 or i == len(chunks):
-                print(f"    Processing chunk {i}/{len(chunks)}...")
+        for i, chunk in enumerate(self.chunker.iter_chunks(pages), 1):
+            chunk_count = i
+            if i % 10 == 0:
+                print(f"    Processing chunk {i}...")
             
             # Extract facts from chunk
             chunk_facts = self.fact_extractor.extract_facts(
@@ -227,6 +225,8 @@ class RAGTrustProcessor:
                     'facts': len(chunk_facts)
                 })
         
+        print(f"    Processed {chunk_count} chunks")
+        
         # Deduplicate and rank facts
         print("  - Deduplicating and ranking facts...")
         all_facts = self.fact_extractor.deduplicate_facts(all_facts)
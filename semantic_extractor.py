@@ -4,10 +4,48 @@ Semantic Fact Extractor - Extract structured facts from trust documents
 
 import re
 import json
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import hashlib
+import zlib
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+import numpy as np
+
+# Simple sentence splitting for provision fallback (can be improved with better NLP)
+SENTENCE_PATTERN = re.compile(r'[A-Z][^.!?]*[.!?]', re.DOTALL)
+
+PROVISION_KEYWORDS = [
+    'shall', 'may', 'must', 'trustee', 'beneficiary', 'distribute',
+    'payment', 'income', 'principal', 'power', 'authority', 'discretion',
+    'terminate', 'vest', 'estate', 'tax', 'exempt'
+]
+
+# A (?:...) group of plain literal alternatives
+_LITERAL_ALTERNATION = re.compile(r'[A-Za-z0-9 ,]+(?:\|[A-Za-z0-9 ,]+)*')
+_COUNTED_QUANTIFIER = re.compile(r'\{\d*,?\d*\}')
+
+# Sentence-ending punctuation followed by whitespace, a period run into a
+# capitalised word, and paragraph breaks
+_SENTENCE_STOP = re.compile(r'[.!?;](?=[ \n\t])')
+_PERIOD_BEFORE_TEXT = re.compile(r'\.(?=\S)')
+_PARAGRAPH_BREAK = re.compile(r'\n(?=\n)')
+_NEWLINE = re.compile(r'\n')
+
+# Near-duplicate facts: MinHash signatures over word shingles, banded for LSH.
+# Two rows per band puts candidates well below the similarity threshold, and
+# every candidate pair is confirmed with an exact Jaccard check
+NEAR_DUPLICATE_THRESHOLD = 0.5
+SHINGLE_WORDS = 3
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 16
+_MINHASH_PRIME = np.uint64(4294967311)
+_MINHASH_A = np.random.RandomState(42).randint(1, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MINHASH_B = np.random.RandomState(43).randint(0, 2 ** 32, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+# Characters re.IGNORECASE matches to an ASCII letter that str.lower() doesn't map to it
+CASEFOLD_EXCEPTIONS = ('\u0130', '\u0131', '\u017f')
 
 @dataclass
 class Fact:
@@ -31,6 +69,392 @@ class Fact:
         return asdict(self)
 
 
+def _has_top_level_alternation(pattern: str) -> bool:
+    """Whether a regex has a '|' outside any group or character class"""
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+    return False
+
+
+def _atom_end(pattern: str, i: int) -> int:
+    """End of the regex atom (escape, class, group or character) starting at i"""
+    char = pattern[i]
+    if char == '\\':
+        return i + 2
+    if char == '[':
+        j = i + 1
+        if pattern[j:j + 1] == '^':
+            j += 1
+        if pattern[j:j + 1] == ']':
+            j += 1
+        while pattern[j] != ']':
+            j += 2 if pattern[j] == '\\' else 1
+        return j + 1
+    if char == '(':
+        depth = 0
+        j = i
+        while True:
+            if pattern[j] == '\\':
+                j += 2
+                continue
+            if pattern[j] == '[':
+                j = _atom_end(pattern, j)
+                continue
+            if pattern[j] == '(':
+                depth += 1
+            elif pattern[j] == ')':
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+    return i + 1
+
+
+def _quantifier_end(pattern: str, i: int) -> int:
+    """End of the quantifier (if any) following an atom that ends at i"""
+    if pattern[i:i + 1] in ('*', '+', '?'):
+        i += 1
+    else:
+        match = _COUNTED_QUANTIFIER.match(pattern, i)
+        if not match:
+            return i
+        i = match.end()
+    # Lazy or possessive modifier
+    if pattern[i:i + 1] in ('?', '+'):
+        i += 1
+    return i
+
+
+def required_literals(pattern: str) -> List[Tuple[Tuple[str, ...], bool]]:
+    """
+    Literal words every match of a regex must contain, in pattern order.
+    
+    Each entry is (lowercased alternatives, whether a match starts with it).
+    This is conservative: escapes, classes and anything else it can't reason
+    about are skipped, so a pattern may have more requirements than listed.
+    """
+    if _has_top_level_alternation(pattern):
+        return []
+    
+    required = []
+    word, word_leads = '', False
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '\\' and (pattern[i + 1:i + 2] in ('x', 'u', 'U', 'N', 'g') or
+                                   pattern[i + 1:i + 2].isdigit()):
+            # Multi-character escapes would read as literals below
+            return required
+        end = _atom_end(pattern, i)
+        quantifier_end = _quantifier_end(pattern, end)
+        atom, quantifier = pattern[i:end], pattern[end:quantifier_end]
+        optional = quantifier[:1] in ('?', '*') or quantifier[:2] in ('{0', '{,')
+        
+        is_literal = len(atom) == 1 and (atom.isalnum() or atom in ' ,')
+        if is_literal and not optional:
+            if not word:
+                word_leads = i == 0
+            word += atom.lower()
+        if word and (not is_literal or quantifier):
+            required.append(((word,), word_leads))
+            word = ''
+        
+        if atom.startswith('(') and not optional:
+            if atom.startswith('(?:'):
+                inner = atom[3:-1]
+            elif atom[1:2] != '?':
+                inner = atom[1:-1]
+            else:
+                # Lookarounds, flags and named groups
+                inner = None
+            if inner is not None and _LITERAL_ALTERNATION.fullmatch(inner):
+                alternatives = tuple(sorted({alt.lower() for alt in inner.split('|')}))
+                required.append((alternatives, i == 0))
+            elif inner is not None:
+                for alternatives, leads in required_literals(inner):
+                    required.append((alternatives, leads and i == 0))
+        i = quantifier_end
+    
+    if word:
+        required.append(((word,), word_leads))
+    return required
+
+
+def _merge_spans(spans: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """
+    Merge closed [start, end] spans into disjoint ones, returned as sorted
+    start and end lists for bisect lookups
+    """
+    starts, ends = [], []
+    for start, end in sorted(spans):
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def _shingles(text: str) -> set:
+    """Word shingles of a normalized fact text"""
+    words = text.split()
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _minhash_signatures(shingle_sets: List[set]) -> np.ndarray:
+    """MinHash signature per shingle set, one row each"""
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingles in shingle_sets for shingle in shingles),
+                         dtype=np.uint64)
+    offsets = np.cumsum([0] + [len(shingles) for shingles in shingle_sets[:-1]])
+    # a * h + b stays below 2**64 for 32-bit hashes and coefficients
+    permuted = (hashes[:, None] * _MINHASH_A + _MINHASH_B) % _MINHASH_PRIME
+    return np.minimum.reduceat(permuted, offsets, axis=0)
+
+
+def _near_duplicate_pairs(texts: List[str], threshold: float) -> Iterator[Tuple[int, int]]:
+    """Index pairs of texts whose shingle Jaccard similarity is at least threshold"""
+    shingle_sets = [_shingles(text) for text in texts]
+    signatures = _minhash_signatures(shingle_sets)
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    
+    checked = set()
+    for band in range(LSH_BANDS):
+        buckets = {}
+        band_signatures = signatures[:, band * rows:(band + 1) * rows]
+        for i in range(len(texts)):
+            buckets.setdefault(band_signatures[i].tobytes(), []).append(i)
+        
+        for members in buckets.values():
+            for pair in combinations(members, 2):
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                first, second = shingle_sets[pair[0]], shingle_sets[pair[1]]
+                if len(first & second) >= threshold * len(first | second):
+                    yield pair
+
+
+class FactPatternEngine:
+    """
+    Precompiled fact patterns matched against a page in one pass.
+    
+    Most fact patterns open with a literal word ("upon", "trustee",
+    "subject to", ...). One case-insensitive scan finds every position where
+    those words start, and each pattern is then only tried at its own anchor
+    positions instead of being searched across the whole page. Patterns are
+    skipped outright when a word they require never occurs on the page, and
+    anchors past the last occurrence of a pattern's final required word are
+    dropped. Patterns without a literal opening fall back to finditer.
+    Matches are identical to running re.finditer for each pattern in turn.
+    """
+    
+    def __init__(self, specs: List[Tuple[str, str, float, int]]):
+        """
+        Args:
+            specs: (pattern, fact_type, confidence, flags) in extraction order
+        """
+        self.patterns = []
+        for pattern, fact_type, confidence, flags in specs:
+            literals = [] if flags & re.VERBOSE else required_literals(pattern)
+            leading = literals[0][0] if literals and literals[0][1] else None
+            required = [alternatives for alternatives, _ in literals]
+            self.patterns.append((re.compile(pattern, flags), fact_type, confidence, leading, required))
+        
+        # Pages whose lowercase form doesn't line up character for character
+        # are scanned with a regex instead. Longest first, so it reports the
+        # longest anchor at each position; any other anchor starting there is
+        # one of its prefixes
+        self.anchors = sorted({anchor for *_, leading, _ in self.patterns if leading for anchor in leading},
+                              key=lambda anchor: (-len(anchor), anchor))
+        self._prefixes = [[other for other in self.anchors if anchor.startswith(other)]
+                          for anchor in self.anchors]
+        self._anchor_scan = None
+        if self.anchors:
+            alternatives = '|'.join(f'({re.escape(anchor)})' for anchor in self.anchors)
+            self._anchor_scan = re.compile(f'(?=(?:{alternatives}))', re.IGNORECASE)
+    
+    def find_anchors(self, text: str, lowered: Optional[str] = None) -> Dict[str, List[int]]:
+        """
+        Start positions of every anchor word in the text, in order
+        
+        Args:
+            text: Page text
+            lowered: text.lower() when its offsets line up with the text
+        """
+        positions = {anchor: [] for anchor in self.anchors}
+        if not self.anchors:
+            return positions
+        
+        if lowered is not None:
+            for anchor in self.anchors:
+                found = positions[anchor]
+                start = lowered.find(anchor)
+                while start != -1:
+                    found.append(start)
+                    start = lowered.find(anchor, start + 1)
+            return positions
+        
+        for match in self._anchor_scan.finditer(text):
+            start = match.start()
+            for anchor in self._prefixes[match.lastindex - 1]:
+                positions[anchor].append(start)
+        return positions
+    
+    def iter_matches(self, text: str) -> Iterator[Tuple[re.Match, str, float]]:
+        """
+        Yield (match, fact_type, confidence) for every pattern, pattern by
+        pattern in spec order and matches in text order
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text) or any(char in text for char in CASEFOLD_EXCEPTIONS):
+            # Substring checks on the lowercase text would be unreliable
+            lowered = None
+        positions = self.find_anchors(text, lowered)
+        
+        for pattern, fact_type, confidence, leading, required in self.patterns:
+            if lowered is not None and \
+                    not all(any(word in lowered for word in alternatives) for alternatives in required):
+                continue
+            
+            if leading is None:
+                matches = pattern.finditer(text)
+            else:
+                starts = positions[leading[0]] if len(leading) == 1 else \
+                    sorted(set().union(*(positions[anchor] for anchor in leading)))
+                if lowered is not None:
+                    last = max(lowered.rfind(word) for word in required[-1])
+                    starts = starts[:bisect_right(starts, last)]
+                matches = self._match_at(pattern, text, starts)
+            
+            for match in matches:
+                yield match, fact_type, confidence
+    
+    @staticmethod
+    def _match_at(pattern: re.Pattern, text: str, starts: List[int]) -> Iterator[re.Match]:
+        """Non-overlapping matches starting at candidate positions, like finditer"""
+        end = 0
+        for start in starts:
+            if start < end:
+                continue
+            match = pattern.match(text, start)
+            if match:
+                yield match
+                end = match.end()
+
+
+class SentenceIndex:
+    """
+    Sentence boundaries of one page, found once and shared by every fact
+    matched on it. Lookups bisect sorted offsets instead of walking the text
+    character by character around each match.
+    """
+    
+    # How far sentence_at() looks around a match for boundaries
+    LOOKBACK_CHARS = 500
+    PARAGRAPH_LOOKBACK_CHARS = 200
+    LOOKAHEAD_CHARS = 800
+    
+    def __init__(self, text: str):
+        self.text = text
+        
+        # Punctuation a sentence can start after, and line starts as a fallback
+        self.stops = [match.start() for match in _SENTENCE_STOP.finditer(text)]
+        self.newlines = [match.start() for match in _NEWLINE.finditer(text)]
+        
+        # Where a sentence ends, keyed by the offset the boundary is found at
+        ends = {i: i + 1 for i in self.stops}
+        for match in _PERIOD_BEFORE_TEXT.finditer(text):
+            if text[match.end()].isupper():
+                ends[match.start()] = match.end()
+        for match in _PARAGRAPH_BREAK.finditer(text):
+            if match.start() < len(text) - 2:
+                ends[match.start()] = match.start()
+        self.end_offsets = sorted(ends)
+        self.end_positions = [ends[i] for i in self.end_offsets]
+    
+    def bounds(self, start: int, end: int) -> Tuple[int, int]:
+        """Start and end offsets of the sentence containing text[start:end]"""
+        sentence_start = start
+        i = bisect_right(self.stops, start - 1) - 1
+        if i >= 0 and self.stops[i] > max(0, start - self.LOOKBACK_CHARS):
+            sentence_start = self.stops[i] + 2
+        else:
+            # If no sentence ending found, look for paragraph start
+            i = bisect_right(self.newlines, start - 1) - 1
+            if i >= 0 and self.newlines[i] > max(0, start - self.PARAGRAPH_LOOKBACK_CHARS):
+                sentence_start = self.newlines[i] + 1
+        
+        sentence_end = end
+        i = bisect_left(self.end_offsets, end)
+        if i < len(self.end_offsets) and self.end_offsets[i] < min(len(self.text), end + self.LOOKAHEAD_CHARS):
+            sentence_end = self.end_positions[i]
+        
+        return sentence_start, sentence_end
+    
+    def sentence_at(self, start: int, end: int) -> str:
+        """Complete sentence containing text[start:end], whitespace collapsed"""
+        sentence_start, sentence_end = self.bounds(start, end)
+        return ' '.join(self.text[sentence_start:sentence_end].split())
+
+
+class EntityMatcher:
+    """
+    Finds which of a page's entities a fact mentions. The distinct entity
+    strings are compiled into one pattern, so each fact is scanned once
+    instead of being searched for every entity in turn. Results match the
+    original substring test: a case-insensitive mention of an entity's text
+    anywhere in the fact, reported once per entity occurrence on the page,
+    in entity order.
+    """
+    
+    def __init__(self, all_entities: Dict[str, List[Tuple[str, int, int]]]):
+        # "TYPE:text" labels in entity order, and the label indices per lowercase text
+        self.labels = []
+        self.label_indices = {}
+        for entity_type, entity_list in all_entities.items():
+            for entity_text, _, _ in entity_list:
+                self.label_indices.setdefault(entity_text.lower(), []).append(len(self.labels))
+                self.labels.append(f"{entity_type}:{entity_text}")
+        
+        # The scan reports the longest entity text starting at each position;
+        # any shorter entity text starting there is one of its prefixes
+        keys = sorted(self.label_indices, key=lambda key: (-len(key), key))
+        self._prefixes = {key: [key[:i] for i in range(1, len(key) + 1) if key[:i] in self.label_indices]
+                          for key in keys}
+        self._scan = None
+        if keys:
+            self._scan = re.compile('(?=(' + '|'.join(re.escape(key) for key in keys) + '))')
+    
+    def find(self, text: str) -> List[str]:
+        """Labels of every entity whose text appears in the given text"""
+        if self._scan is None:
+            return []
+        
+        mentioned = set()
+        for match in self._scan.finditer(text.lower()):
+            mentioned.update(self._prefixes[match.group(1)])
+        
+        indices = sorted(i for key in mentioned for i in self.label_indices[key])
+        return [self.labels[i] for i in indices]
+
+
 class SemanticFactExtractor:
     """Extract semantic facts from trust documents"""
     
@@ -108,6 +532,20 @@ class SemanticFactExtractor:
                 r'upon\s+(?:termination|conclusion)\s+(.+?)(?:\.|,)',
             ]
         }
+        
+        # Compile everything once; extract_facts runs per page
+        self.entity_regexes = {
+            entity_type: [re.compile(pattern) for pattern in patterns]
+            for entity_type, patterns in self.entity_patterns.items()
+        }
+        self.fact_engine = FactPatternEngine(
+            [(pattern, fact_type, 0.8, re.IGNORECASE)
+             for pattern, fact_type in self.relationship_patterns] +
+            [(pattern, fact_type, 0.7, re.IGNORECASE)
+             for pattern, fact_type in self.condition_patterns] +
+            [(pattern, fact_type, 0.9, re.IGNORECASE | re.DOTALL)
+             for fact_type, patterns in self.trust_patterns.items() for pattern in patterns]
+        )
     
     def extract_facts(self, text: str, page_num: int = 1, 
                      start_position: int = 0) -> List[Fact]:
@@ -126,73 +564,43 @@ class SemanticFactExtractor:
         
         # Extract entities first
         entities = self._extract_entities(text)
-        
-        # Extract relationship facts
-        for pattern, fact_type in self.relationship_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                # Get complete sentence instead of just the match
-                fact_text = self._get_complete_sentence(text, match.start(), match.end())
-                position = start_position + match.start()
-                context = self._get_context(text, match.start(), match.end())
-                
-                fact = Fact(
-                    fact=fact_text,
-                    page=page_num,
-                    char_position=position,
-                    fact_type=fact_type,
-                    confidence=0.8,
-                    entities=self._find_entities_in_text(fact_text, entities),
-                    context=context
-                )
-                facts.append(fact)
-        
-        # Extract condition facts
-        for pattern, fact_type in self.condition_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                # Get complete sentence instead of just the match
-                fact_text = self._get_complete_sentence(text, match.start(), match.end())
-                position = start_position + match.start()
-                context = self._get_context(text, match.start(), match.end())
-                
-                fact = Fact(
-                    fact=fact_text,
-                    page=page_num,
-                    char_position=position,
-                    fact_type=fact_type,
-                    confidence=0.7,
-                    entities=self._find_entities_in_text(fact_text, entities),
-                    context=context
-                )
-                facts.append(fact)
-        
-        # Extract trust-specific facts
-        for fact_type, patterns in self.trust_patterns.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, text, re.IGNORECASE | re.DOTALL):
-                    # Get complete sentence instead of just the match
-                    fact_text = self._get_complete_sentence(text, match.start(), match.end())
-                    position = start_position + match.start()
-                    context = self._get_context(text, match.start(), match.end())
-                    
-                    fact = Fact(
-                        fact=fact_text,
-                        page=page_num,
-                        char_position=position,
-                        fact_type=fact_type,
-                        confidence=0.9,
-                        entities=self._find_entities_in_text(fact_text, entities),
-                        context=context
-                    )
-                    facts.append(fact)
+        entity_matcher = EntityMatcher(entities)
+        
+        # Relationship, condition and trust-specific facts in a single pass
+        sentences = SentenceIndex(text)
+        for match, fact_type, confidence in self.fact_engine.iter_matches(text):
+            # Get complete sentence instead of just the match
+            fact_text = self._get_complete_sentence(text, match.start(), match.end(), sentences)
+            position = start_position + match.start()
+            context = self._get_context(text, match.start(), match.end())
+            
+            fact = Fact(
+                fact=fact_text,
+                page=page_num,
+                char_position=position,
+                fact_type=fact_type,
+                confidence=confidence,
+                entities=self._find_entities_in_text(fact_text, entities, entity_matcher),
+                context=context
+            )
+            facts.append(fact)
         
         # Extract provision sentences (fallback for important content)
         provision_sentences = self._extract_provision_sentences(text)
+        captured_starts, captured_ends = _merge_spans(
+            (f.char_position - start_position, f.char_position - start_position + len(f.fact))
+            for f in facts
+        )
+        # Sentences arrive in text order, so provisions added below only
+        # ever cover offsets from the current sentence onwards
+        provision_reach = -1
         for sent_text, sent_start in provision_sentences:
             # Check if this sentence is already captured
-            if not any(sent_start >= f.char_position - start_position and 
-                      sent_start <= f.char_position - start_position + len(f.fact) 
-                      for f in facts):
+            i = bisect_right(captured_starts, sent_start) - 1
+            captured = (i >= 0 and sent_start <= captured_ends[i]) or sent_start <= provision_reach
+            if not captured:
                 position = start_position + sent_start
+                provision_reach = max(provision_reach, sent_start + len(sent_text))
                 
                 fact = Fact(
                     fact=sent_text,
@@ -200,7 +608,7 @@ class SemanticFactExtractor:
                     char_position=position,
                     fact_type='provision',
                     confidence=0.6,
-                    entities=self._find_entities_in_text(sent_text, entities),
+                    entities=self._find_entities_in_text(sent_text, entities, entity_matcher),
                     context=sent_text  # Use full sentence as context
                 )
                 facts.append(fact)
@@ -211,10 +619,10 @@ class SemanticFactExtractor:
         """Extract named entities from text"""
         entities = {}
         
-        for entity_type, patterns in self.entity_patterns.items():
+        for entity_type, patterns in self.entity_regexes.items():
             entities[entity_type] = []
             for pattern in patterns:
-                for match in re.finditer(pattern, text):
+                for match in pattern.finditer(text):
                     entity_text = match.group(0)
                     start = match.start()
                     end = match.end()
@@ -222,14 +630,19 @@ class SemanticFactExtractor:
         
         return entities
     
-    def _find_entities_in_text(self, text: str, all_entities: Dict) -> List[str]:
-        """Find which entities appear in a given text"""
-        found = []
-        for entity_type, entity_list in all_entities.items():
-            for entity_text, _, _ in entity_list:
-                if entity_text.lower() in text.lower():
-                    found.append(f"{entity_type}:{entity_text}")
-        return found
+    def _find_entities_in_text(self, text: str, all_entities: Dict,
+                               matcher: Optional[EntityMatcher] = None) -> List[str]:
+        """
+        Find which entities appear in a given text
+        
+        Args:
+            text: Fact text
+            all_entities: Entities extracted from the page
+            matcher: EntityMatcher for the page, shared across its facts
+        """
+        if matcher is None:
+            matcher = EntityMatcher(all_entities)
+        return matcher.find(text)
     
     def _get_context(self, text: str, start: int, end: int, 
                      context_chars: int = 100) -> str:
@@ -250,82 +663,42 @@ class SemanticFactExtractor:
         
         return context
     
-    def _get_complete_sentence(self, text: str, start: int, end: int) -> str:
-        """Extract complete sentence containing the match"""
-        # Find sentence start (look backwards for sentence ending)
-        sentence_start = start
-        for i in range(start - 1, max(0, start - 500), -1):
-            if text[i] in '.!?;' and i + 1 < len(text) and text[i + 1] in ' \n\t':
-                sentence_start = i + 2
-                break
-        else:
-            # If no sentence ending found, look for paragraph start
-            for i in range(start - 1, max(0, start - 200), -1):
-                if text[i] == '\n':
-                    sentence_start = i + 1
-                    break
-        
-        # Find sentence end (look forward for sentence ending)
-        sentence_end = end
+    def _get_complete_sentence(self, text: str, start: int, end: int,
+                               sentences: Optional[SentenceIndex] = None) -> str:
+        """
+        Extract complete sentence containing the match
         
-        # More aggressive search for sentence completion
-        for i in range(end, min(len(text), end + 800)):
-            # Check for sentence endings
-            if i < len(text) - 1:
-                # Period followed by space or newline
-                if text[i] == '.' and (text[i+1] in ' \n\t' or text[i+1].isupper()):
-                    sentence_end = i + 1
-                    break
-                # Semicolon or other endings
-                elif text[i] in ';!?' and text[i+1] in ' \n\t':
-                    sentence_end = i + 1
-                    break
-                # Double newline (paragraph break)
-                elif i < len(text) - 2 and text[i:i+2] == '\n\n':
-                    sentence_end = i
-                    break
-        
-        # Extract the complete sentence
-        sentence = text[sentence_start:sentence_end].strip()
-        
-        # Clean up excessive whitespace but preserve some structure
-        lines = sentence.split('\n')
-        cleaned_lines = [' '.join(line.split()) for line in lines]
-        sentence = ' '.join(cleaned_lines)
-        
-        # Final cleanup to remove multiple spaces
-        sentence = ' '.join(sentence.split())
-        
-        return sentence
+        Args:
+            text: Page text
+            start: Match start offset
+            end: Match end offset
+            sentences: Sentence index for the page, shared across its matches
+        """
+        if sentences is None or sentences.text is not text:
+            sentences = SentenceIndex(text)
+        return sentences.sentence_at(start, end)
     
     def _extract_provision_sentences(self, text: str) -> List[Tuple[str, int]]:
         """Extract sentences that look like legal provisions"""
-        provision_keywords = [
-            'shall', 'may', 'must', 'trustee', 'beneficiary', 'distribute',
-            'payment', 'income', 'principal', 'power', 'authority', 'discretion',
-            'terminate', 'vest', 'estate', 'tax', 'exempt'
-        ]
-        
         sentences = []
-        # Simple sentence splitting (can be improved with better NLP)
-        sent_pattern = r'[A-Z][^.!?]*[.!?]'
         
-        for match in re.finditer(sent_pattern, text, re.DOTALL):
+        for match in SENTENCE_PATTERN.finditer(text):
             sent = match.group(0)
             sent_lower = sent.lower()
             
             # Check if sentence contains provision keywords
-            if any(keyword in sent_lower for keyword in provision_keywords):
+            if any(keyword in sent_lower for keyword in PROVISION_KEYWORDS):
                 sentences.append((sent.strip(), match.start()))
         
         return sentences
     
-    def extract_from_pages(self, pages: List[Dict]) -> List[Fact]:
+    def extract_from_pages(self, pages: Iterable[Dict]) -> List[Fact]:
         """
         Extract facts from multiple pages
         
         Args:
-            pages: List of page dictionaries with 'text' and 'page_number'
+            pages: Page dictionaries with 'text' and 'page_number' (a list or
+                   a stream such as PDFProcessor.iter_pages)
         
         Returns:
             List of all extracted facts
@@ -344,20 +717,68 @@ class SemanticFactExtractor:
         
         return all_facts
     
-    def deduplicate_facts(self, facts: List[Fact]) -> List[Fact]:
-        """Remove duplicate or highly similar facts"""
-        unique_facts = []
-        seen_texts = set()
+    def deduplicate_facts(self, facts: List[Fact],
+                          similarity_threshold: Optional[float] = NEAR_DUPLICATE_THRESHOLD) -> List[Fact]:
+        """
+        Remove duplicate or highly similar facts
         
-        for fact in facts:
+        Facts with the same normalized text are duplicates wherever they
+        appear. Facts on the same page whose word shingles overlap by at least
+        similarity_threshold (Jaccard) are near-duplicates, typically one
+        sentence captured by several patterns with slightly different
+        boundaries. Each group is replaced by its highest-confidence fact,
+        at the position of the group's first fact.
+        
+        Args:
+            facts: Extracted facts
+            similarity_threshold: Minimum similarity for near-duplicates, or
+                                  None to only remove exact duplicates
+        
+        Returns:
+            Deduplicated facts
+        """
+        # Union-find over fact indices
+        parent = list(range(len(facts)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        def union(i: int, j: int):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+        
+        first_seen = {}
+        pages = {}
+        for i, fact in enumerate(facts):
             # Normalize fact text for comparison
             normalized = ' '.join(fact.fact.lower().split())
             
-            if normalized not in seen_texts:
-                seen_texts.add(normalized)
-                unique_facts.append(fact)
-        
-        return unique_facts
+            if normalized in first_seen:
+                union(first_seen[normalized], i)
+            else:
+                first_seen[normalized] = i
+                pages.setdefault(fact.page, []).append((i, normalized))
+        
+        if similarity_threshold is not None:
+            for page_facts in pages.values():
+                if len(page_facts) < 2:
+                    continue
+                indices = [i for i, _ in page_facts]
+                for a, b in _near_duplicate_pairs([text for _, text in page_facts], similarity_threshold):
+                    union(indices[a], indices[b])
+        
+        # Highest confidence wins, earliest first on ties
+        best = {}
+        for i, fact in enumerate(facts):
+            root = find(i)
+            if root not in best or fact.confidence > facts[best[root]].confidence:
+                best[root] = i
+        
+        return [facts[best[root]] for root in sorted(best)]
     
     def rank_facts_by_importance(self, facts: List[Fact]) -> List[Fact]:
         """Rank facts by importance based on type and confidence"""
@@ -394,13 +815,12 @@ def extract_facts_from_document(pdf_path: str) -> List[Fact]:
     """
     from pdf_processor import PDFProcessor
     
-    # Extract text from PDF
+    # Stream pages from the PDF so extraction starts with the first page
     processor = PDFProcessor()
-    full_text, pages = processor.extract_text_from_pdf(pdf_path)
     
     # Extract facts
     extractor = SemanticFactExtractor()
-    facts = extractor.extract_from_pages(pages)
+    facts = extractor.extract_from_pages(processor.iter_pages(pdf_path))
     
     # Deduplicate and rank
     facts = extractor.deduplicate_facts(facts)
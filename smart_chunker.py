@@ -3,10 +3,13 @@ Smart Chunker - Intelligent document chunking with semantic boundaries
 """
 
 import re
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator
+from itertools import chain, islice
+from dataclasses import dataclass, field, replace
 import hashlib
 
+from token_budget import get_token_estimator, get_chunk_token_budget
+
 
 @dataclass
 class DocumentChunk:
@@ -22,6 +25,7 @@ class DocumentChunk:
     section_headers: List[str]
     context_before: str  # Previous chunk summary
     context_after: str   # Next chunk summary
+    page_hashes: Dict[int, str] = field(default_factory=dict)  # Source page fingerprints
     
     def to_dict(self) -> Dict:
         return {
@@ -35,17 +39,42 @@ class DocumentChunk:
             'chunk_type': self.chunk_type,
             'section_headers': self.section_headers,
             'context_before': self.context_before,
-            'context_after': self.context_after
+            'context_after': self.context_after,
+            'page_hashes': self.page_hashes
         }
 
 
+@dataclass
+class RechunkResult:
+    """Chunks for an updated document and how they differ from the previous set"""
+    chunks: List[DocumentChunk]
+    added: List[str]      # Chunk IDs that are new
+    removed: List[str]    # Previous chunk IDs that no longer exist
+    unchanged: List[str]  # Chunk IDs whose text is identical to a previous chunk
+    rechunked_from_page: Optional[int]  # First page re-chunked (None = nothing changed)
+
+
+def compute_chunk_id(text: str) -> str:
+    """Content-addressed chunk ID: hash of the whitespace-normalized text"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def compute_page_hash(text: str) -> str:
+    """Fingerprint of a page's text, used to find changed pages when re-chunking"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
 class SmartChunker:
     """Intelligent document chunker that respects semantic boundaries"""
     
     def __init__(self, 
                  max_chunk_size: int = 15000,
                  overlap_size: int = 500,
-                 min_chunk_size: int = 1000):
+                 min_chunk_size: int = 1000,
+                 max_chunk_tokens: Optional[int] = None,
+                 model: Optional[str] = None,
+                 token_estimator: Optional[Callable[[str], int]] = None):
         """
         Initialize smart chunker
         
@@ -53,11 +82,31 @@ class SmartChunker:
             max_chunk_size: Maximum characters per chunk
             overlap_size: Characters to overlap between chunks
             min_chunk_size: Minimum chunk size to avoid tiny chunks
+            max_chunk_tokens: Token budget per chunk; enables token mode, where
+                              chunks are sized by tokens and never exceed the budget
+            model: LLM model whose budget (and tokenizer) to use for token mode
+            token_estimator: Callable returning a token count for a text
+                             (default: tiktoken if installed, else chars / 4)
         """
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
         self.min_chunk_size = min_chunk_size
         
+        # Token mode: sizes below are measured in tokens instead of characters
+        if max_chunk_tokens is None and model is not None:
+            max_chunk_tokens = get_chunk_token_budget(model)
+        self.max_chunk_tokens = max_chunk_tokens
+        self.token_mode = max_chunk_tokens is not None
+        self.estimate_tokens = token_estimator or get_token_estimator(model)
+        
+        if self.token_mode:
+            self.max_size = max_chunk_tokens
+            # Keep the same min/max proportion as the character defaults
+            self.min_size = max(1, max_chunk_tokens * min_chunk_size // max_chunk_size)
+        else:
+            self.max_size = max_chunk_size
+            self.min_size = min_chunk_size
+        
         # Semantic boundary patterns for trust documents
         self.section_patterns = [
             # Articles and sections
@@ -115,6 +164,10 @@ class SmartChunker:
         # Sentence boundaries
         self.sentence_pattern = re.compile(r'[.!?]\s+')
     
+    def measure(self, text: str) -> int:
+        """Size of a text in the chunker's unit (tokens in token mode, else characters)"""
+        return self.estimate_tokens(text) if self.token_mode else len(text)
+    
     def chunk_document(self, pages: List[Dict]) -> List[DocumentChunk]:
         """
         Chunk document intelligently using semantic boundaries
@@ -125,8 +178,22 @@ class SmartChunker:
         Returns:
             List of document chunks
         """
-        # First, identify document structure
-        structure = self._analyze_structure(pages)
+        return list(self.iter_chunks(pages))
+    
+    def iter_chunks(self, pages: Iterable[Dict]) -> Iterator[DocumentChunk]:
+        """
+        Stream finalized chunks from an iterable of pages (e.g.
+        PDFProcessor.iter_pages), so extraction can start before the whole
+        document is chunked. Only the first 10 pages (for structure analysis),
+        the chunk being built and two finished chunks (merge and context
+        lookahead) are held in memory at a time.
+        """
+        pages = iter(pages)
+        
+        # First, identify document structure from the opening pages
+        head = list(islice(pages, 10))
+        structure = self._analyze_structure(head)
+        pages = chain(head, pages)
         
         # Create chunks based on structure
         if structure['has_sections']:
@@ -134,13 +201,99 @@ class SmartChunker:
         else:
             chunks = self._chunk_by_pages(pages)
         
-        # Add context windows
-        chunks = self._add_context_windows(chunks)
-        
-        # Validate and adjust chunks
+        # Validate and adjust chunks, then add context windows
         chunks = self._validate_chunks(chunks)
+        return self._add_context_windows(chunks)
+    
+    def rechunk(self, previous_chunks: List[DocumentChunk], pages: List[Dict]) -> RechunkResult:
+        """
+        Re-chunk an updated document (amendment pages appended, pages re-OCR'd),
+        reusing the previous chunks that come before the first changed page.
+        
+        Section chunking restarts at the start of the last reusable chunk's
+        following page, with the chunker state a full run would have there, so
+        the result matches chunk_document(pages). Page-mode documents, or edits
+        that could change the detected structure, are re-chunked in full.
         
-        return chunks
+        Args:
+            previous_chunks: Chunks from the previous version of the document
+            pages: Complete page list of the new version
+        
+        Returns:
+            RechunkResult with the new chunks and added/removed/unchanged chunk IDs
+        """
+        previous_hashes = {}
+        for chunk in previous_chunks:
+            previous_hashes.update(chunk.page_hashes)
+        
+        # First page whose text differs, was added, or was removed
+        new_page_numbers = set()
+        first_changed = None
+        for page in pages:
+            page_num = page.get('page_number', 1)
+            new_page_numbers.add(page_num)
+            if first_changed is None and previous_hashes.get(page_num) != compute_page_hash(page.get('text', '')):
+                first_changed = page_num
+        removed_pages = [p for p in previous_hashes if p not in new_page_numbers]
+        if removed_pages:
+            first_changed = min([first_changed] + removed_pages if first_changed is not None else removed_pages)
+        
+        if first_changed is None and previous_chunks:
+            ids = [chunk.chunk_id for chunk in previous_chunks]
+            return RechunkResult(list(previous_chunks), [], [], ids, None)
+        
+        chunks = None
+        rechunked_from_page = pages[0].get('page_number', 1) if pages else None
+        structure = self._analyze_structure(pages[:10])
+        
+        if structure['has_sections'] and all(c.chunk_type != 'page' for c in previous_chunks):
+            # Previous chunks entirely before the first changed page
+            kept = 0
+            while kept < len(previous_chunks) and max(previous_chunks[kept].pages) < first_changed:
+                kept += 1
+            
+            # The seed chunk must end on a page boundary, and the boundary after it must
+            # have been decided by an unchanged page
+            while kept > 0:
+                seed = previous_chunks[kept - 1]
+                following = previous_chunks[kept] if kept < len(previous_chunks) else None
+                if (following is None or following.start_page > seed.end_page) and seed.end_page + 1 < first_changed:
+                    break
+                kept -= 1
+            
+            if kept > 0:
+                seed = previous_chunks[kept - 1]
+                resume_index = next((i for i, page in enumerate(pages)
+                                     if page.get('page_number', 1) > seed.end_page), len(pages))
+                resume_char = sum(len(page.get('text', '')) for page in pages[:resume_index])
+                
+                # Copy the seed: the validation stage may merge the next chunk into it
+                # (context_after is refilled by the context stage if anything follows it)
+                seed_copy = replace(seed, pages=list(seed.pages),
+                                    section_headers=list(seed.section_headers),
+                                    page_hashes=dict(seed.page_hashes),
+                                    context_after="")
+                raw_chunks = self._chunk_by_sections(pages[resume_index:], structure, start_char=resume_char)
+                resumed = self._add_context_windows(self._validate_chunks(raw_chunks, prev_chunk=seed_copy))
+                
+                chunks = list(previous_chunks[:kept - 1]) + list(resumed)
+                if kept > 1:
+                    chunks[kept - 2] = replace(chunks[kept - 2],
+                                               context_after=self._summarize_chunk(chunks[kept - 1]))
+                rechunked_from_page = seed.start_page
+        
+        if chunks is None:
+            chunks = self.chunk_document(pages)
+        
+        previous_ids = {chunk.chunk_id for chunk in previous_chunks}
+        new_ids = {chunk.chunk_id for chunk in chunks}
+        return RechunkResult(
+            chunks=chunks,
+            added=[chunk.chunk_id for chunk in chunks if chunk.chunk_id not in previous_ids],
+            removed=[chunk.chunk_id for chunk in previous_chunks if chunk.chunk_id not in new_ids],
+            unchanged=[chunk.chunk_id for chunk in chunks if chunk.chunk_id in previous_ids],
+            rechunked_from_page=rechunked_from_page
+        )
     
     def _analyze_structure(self, pages: List[Dict]) -> Dict:
         """Analyze document structure to determine chunking strategy"""
@@ -165,155 +318,152 @@ class SmartChunker:
         
         return structure
     
-    def _chunk_by_sections(self, pages: List[Dict], structure: Dict) -> List[DocumentChunk]:
-        """Chunk document by semantic sections"""
-        chunks = []
-        current_chunk_text = ""
-        current_pages = []
-        current_headers = []
-        current_start_page = 1
-        current_start_char = 0
-        total_chars = 0
+    def _chunk_by_sections(self, pages: Iterable[Dict], structure: Dict,
+                           start_char: int = 0) -> Iterator[DocumentChunk]:
+        """
+        Chunk document by semantic sections. Section headers and page starts are
+        the only places a chunk may begin; chunks are packed greedily up to the
+        maximum size (characters, or tokens in token mode), and a section header
+        closes the current chunk once it has reached the minimum size. Every
+        character lands in exactly one chunk; chunk text is collected as a list
+        of slices and joined once.
+        """
+        parts = []
+        chunk_pages = []
+        chunk_page_hashes = {}
+        chunk_headers = []
+        chunk_start_char = 0
+        chunk_end_char = 0
+        current_size = 0
+        raw_offset = start_char
         
         for page in pages:
             page_text = page.get('text', '')
             page_num = page.get('page_number', 1)
+            marker = f"\n[Page {page_num}]\n"
+            page_block = f"{marker}{page_text}\n"
+            page_hash = compute_page_hash(page_text)
             
-            # Find section boundaries in this page
-            section_boundaries = list(self.section_regex.finditer(page_text))
-            
-            if not section_boundaries:
-                # No section boundary, add to current chunk
-                if len(current_chunk_text) + len(page_text) <= self.max_chunk_size:
-                    current_chunk_text += f"\n[Page {page_num}]\n{page_text}\n"
-                    current_pages.append(page_num)
+            # Boundaries within this page: (offset in page_block, section header or None)
+            boundaries = [(0, None)]
+            for match in self.section_regex.finditer(page_text):
+                if match.start() == 0:
+                    # Header at the very top of the page: the page start is the boundary
+                    boundaries[0] = (0, match.group().strip())
                 else:
-                    # Chunk is too large, split at paragraph or sentence
-                    if current_chunk_text:
-                        chunks.append(self._create_chunk(
-                            current_chunk_text, current_pages, 
-                            current_start_page, current_start_char,
-                            'semantic', current_headers
-                        ))
-                    
-                    current_chunk_text = f"\n[Page {page_num}]\n{page_text}\n"
-                    current_pages = [page_num]
-                    current_start_page = page_num
-                    current_start_char = total_chars
-                    current_headers = []
-            else:
-                # Process text with section boundaries
-                last_pos = 0
-                for match in section_boundaries:
-                    # Add text before section
-                    before_text = page_text[last_pos:match.start()]
-                    if before_text.strip():
-                        if len(current_chunk_text) + len(before_text) <= self.max_chunk_size:
-                            current_chunk_text += before_text
-                        else:
-                            # Save current chunk
-                            if current_chunk_text:
-                                chunks.append(self._create_chunk(
-                                    current_chunk_text, current_pages,
-                                    current_start_page, current_start_char,
-                                    'semantic', current_headers
-                                ))
-                            current_chunk_text = before_text
-                            current_pages = [page_num]
-                            current_start_page = page_num
-                            current_start_char = total_chars + last_pos
-                            current_headers = []
-                    
-                    # Start new chunk with section header
-                    if current_chunk_text and len(current_chunk_text) > self.min_chunk_size:
-                        chunks.append(self._create_chunk(
-                            current_chunk_text, current_pages,
-                            current_start_page, current_start_char,
-                            'semantic', current_headers
-                        ))
-                        current_chunk_text = ""
-                        current_pages = []
-                        current_headers = []
+                    boundaries.append((len(marker) + match.start(), match.group().strip()))
+            boundaries.append((len(page_block), None))
+            
+            for (unit_start, header), (unit_end, _) in zip(boundaries, boundaries[1:]):
+                unit = page_block[unit_start:unit_end]
+                unit_size = self.measure(unit)
+                
+                if parts:
+                    starts_section = header is not None and current_size > self.min_size
+                    too_large = current_size + unit_size > self.max_size
                     
-                    # Add section header
-                    section_header = match.group().strip()
-                    current_headers.append(section_header)
-                    current_chunk_text += f"\n[Page {page_num}]\n{page_text[match.start():]}"
-                    current_pages = [page_num] if page_num not in current_pages else current_pages
-                    current_start_page = page_num
-                    current_start_char = total_chars + match.start()
-                    last_pos = len(page_text)
+                    if starts_section or too_large:
+                        yield self._create_section_chunk(
+                            parts, chunk_pages, chunk_page_hashes, chunk_headers,
+                            chunk_start_char, chunk_end_char
+                        )
+                        parts = []
+                        chunk_pages = []
+                        chunk_page_hashes = {}
+                        chunk_headers = []
+                        current_size = 0
+                
+                if not parts:
+                    if unit_start > 0:
+                        # Chunk opens mid-page at a section header; keep the page marker for citations
+                        parts.append(marker)
+                    chunk_start_char = raw_offset + max(unit_start - len(marker), 0)
+                if not chunk_pages or chunk_pages[-1] != page_num:
+                    chunk_pages.append(page_num)
+                    chunk_page_hashes[page_num] = page_hash
+                if header is not None:
+                    chunk_headers.append(header)
                 
-                # Add remaining text
-                if last_pos < len(page_text):
-                    remaining = page_text[last_pos:]
-                    if remaining.strip():
-                        current_chunk_text += remaining
-                        if page_num not in current_pages:
-                            current_pages.append(page_num)
+                parts.append(unit)
+                current_size += unit_size
+                chunk_end_char = raw_offset + min(max(unit_end - len(marker), 0), len(page_text))
             
-            total_chars += len(page_text)
+            raw_offset += len(page_text)
         
         # Add final chunk
-        if current_chunk_text:
-            chunks.append(self._create_chunk(
-                current_chunk_text, current_pages,
-                current_start_page, current_start_char,
-                'semantic', current_headers
-            ))
-        
-        return chunks
+        if parts:
+            yield self._create_section_chunk(
+                parts, chunk_pages, chunk_page_hashes, chunk_headers,
+                chunk_start_char, chunk_end_char
+            )
     
-    def _chunk_by_pages(self, pages: List[Dict]) -> List[DocumentChunk]:
+    def _create_section_chunk(self, parts: List[str], pages: List[int], page_hashes: Dict[int, str],
+                              headers: List[str], start_char: int, end_char: int) -> DocumentChunk:
+        """Create a semantic chunk from collected text slices"""
+        chunk = self._create_chunk(
+            "".join(parts), pages, pages[0], start_char, 'semantic', headers, page_hashes
+        )
+        chunk.end_char = end_char
+        return chunk
+    
+    def _chunk_by_pages(self, pages: Iterable[Dict]) -> Iterator[DocumentChunk]:
         """Fallback: chunk by pages when no clear structure"""
-        chunks = []
-        current_chunk_text = ""
+        current_parts = []
         current_pages = []
+        current_page_hashes = {}
         current_start_page = 1
         current_start_char = 0
+        current_size = 0
         total_chars = 0
         
         for page in pages:
             page_text = page.get('text', '')
             page_num = page.get('page_number', 1)
+            page_block = f"\n[Page {page_num}]\n{page_text}\n"
+            page_size = self.measure(page_block)
             
             # Check if adding this page exceeds max size
-            if len(current_chunk_text) + len(page_text) <= self.max_chunk_size:
-                current_chunk_text += f"\n[Page {page_num}]\n{page_text}\n"
+            if current_size + self.measure(page_text) <= self.max_size:
+                current_parts.append(page_block)
+                current_size += page_size
                 current_pages.append(page_num)
+                current_page_hashes[page_num] = compute_page_hash(page_text)
             else:
                 # Save current chunk
+                current_chunk_text = "".join(current_parts)
                 if current_chunk_text:
-                    chunks.append(self._create_chunk(
+                    yield self._create_chunk(
                         current_chunk_text, current_pages,
                         current_start_page, current_start_char,
-                        'page', []
-                    ))
+                        'page', [], current_page_hashes
+                    )
                 
                 # Start new chunk with overlap
                 overlap_text = self._get_overlap_text(current_chunk_text)
-                current_chunk_text = overlap_text + f"\n[Page {page_num}]\n{page_text}\n"
+                current_parts = [overlap_text, page_block]
+                current_size = self.measure(overlap_text) + page_size
                 current_pages = [page_num]
+                current_page_hashes = {page_num: compute_page_hash(page_text)}
                 current_start_page = page_num
                 current_start_char = total_chars
             
             total_chars += len(page_text)
         
         # Add final chunk
+        current_chunk_text = "".join(current_parts)
         if current_chunk_text:
-            chunks.append(self._create_chunk(
+            yield self._create_chunk(
                 current_chunk_text, current_pages,
                 current_start_page, current_start_char,
-                'page', []
-            ))
-        
-        return chunks
+                'page', [], current_page_hashes
+            )
     
     def _create_chunk(self, text: str, pages: List[int], 
                      start_page: int, start_char: int,
-                     chunk_type: str, headers: List[str]) -> DocumentChunk:
+                     chunk_type: str, headers: List[str],
+                     page_hashes: Dict[int, str] = None) -> DocumentChunk:
         """Create a DocumentChunk object"""
-        chunk_id = hashlib.md5(f"{text[:100]}_{start_page}".encode()).hexdigest()[:8]
+        chunk_id = compute_chunk_id(text)
         
         return DocumentChunk(
             chunk_id=chunk_id,
@@ -326,7 +476,8 @@ class SmartChunker:
             chunk_type=chunk_type,
             section_headers=headers,
             context_before="",  # Will be filled by _add_context_windows
-            context_after=""    # Will be filled by _add_context_windows
+            context_after="",   # Will be filled by _add_context_windows
+            page_hashes=dict(page_hashes or {})
         )
     
     def _get_overlap_text(self, text: str) -> str:
@@ -350,22 +501,19 @@ class SmartChunker:
         # Fall back to character boundary
         return text[-self.overlap_size:].strip() + "\n"
     
-    def _add_context_windows(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
-        """Add context summaries from adjacent chunks"""
-        for i, chunk in enumerate(chunks):
-            # Add previous context
-            if i > 0:
-                prev_chunk = chunks[i-1]
-                # Create a brief summary of previous chunk
-                chunk.context_before = self._summarize_chunk(prev_chunk)
-            
-            # Add next context
-            if i < len(chunks) - 1:
-                next_chunk = chunks[i+1]
-                # Create a brief summary of next chunk
-                chunk.context_after = self._summarize_chunk(next_chunk)
-        
-        return chunks
+    def _add_context_windows(self, chunks: Iterable[DocumentChunk]) -> Iterator[DocumentChunk]:
+        """Add context summaries from adjacent chunks, holding back one chunk as lookahead"""
+        previous = None
+        for chunk in chunks:
+            if previous is not None:
+                # Brief summaries of the neighbouring chunks
+                previous.context_after = self._summarize_chunk(chunk)
+                chunk.context_before = self._summarize_chunk(previous)
+                yield previous
+            previous = chunk
+        
+        if previous is not None:
+            yield previous
     
     def _summarize_chunk(self, chunk: DocumentChunk) -> str:
         """Create a brief summary of a chunk for context"""
@@ -388,81 +536,146 @@ class SmartChunker:
         
         return " | ".join(summary_parts)
     
-    def _validate_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
-        """Validate and adjust chunks if needed"""
-        validated = []
+    def _validate_chunks(self, chunks: Iterable[DocumentChunk],
+                         prev_chunk: Optional[DocumentChunk] = None) -> Iterator[DocumentChunk]:
+        """
+        Validate and adjust chunks if needed. The last validated chunk is held
+        back until the next one arrives, since a too-small chunk is merged into it.
+        prev_chunk seeds that state when resuming after an already-validated chunk.
+        """
+        # Token budgets are hard limits; character sizes get some slack
+        merge_limit = self.max_size if self.token_mode else self.max_size * 1.2
+        split_limit = self.max_size if self.token_mode else self.max_size * 1.5
         
         for chunk in chunks:
             # Check minimum size
-            if len(chunk.text) < self.min_chunk_size and validated:
+            if self.measure(chunk.text) < self.min_size and prev_chunk is not None:
                 # Merge with previous chunk if too small
-                prev_chunk = validated[-1]
-                if len(prev_chunk.text) + len(chunk.text) <= self.max_chunk_size * 1.2:
+                if self.measure(prev_chunk.text + "\n" + chunk.text) <= merge_limit:
                     # Merge chunks
                     prev_chunk.text += "\n" + chunk.text
+                    prev_chunk.chunk_id = compute_chunk_id(prev_chunk.text)
                     prev_chunk.pages.extend(p for p in chunk.pages if p not in prev_chunk.pages)
+                    prev_chunk.page_hashes.update(chunk.page_hashes)
                     prev_chunk.end_page = chunk.end_page
                     prev_chunk.end_char = chunk.end_char
                     prev_chunk.section_headers.extend(chunk.section_headers)
                     continue
             
             # Check maximum size
-            if len(chunk.text) > self.max_chunk_size * 1.5:
+            if self.measure(chunk.text) > split_limit:
                 # Split oversized chunk
-                sub_chunks = self._split_large_chunk(chunk)
-                validated.extend(sub_chunks)
+                validated = self._split_large_chunk(chunk)
             else:
-                validated.append(chunk)
+                validated = [chunk]
+            
+            if prev_chunk is not None:
+                yield prev_chunk
+            yield from validated[:-1]
+            prev_chunk = validated[-1]
         
-        return validated
+        if prev_chunk is not None:
+            yield prev_chunk
     
     def _split_large_chunk(self, chunk: DocumentChunk) -> List[DocumentChunk]:
         """Split a chunk that's too large"""
         sub_chunks = []
         text = chunk.text
         
-        # Try to split at paragraph boundaries
-        paragraphs = self.paragraph_pattern.split(text)
+        # Try to split at paragraph boundaries, collecting parts and joining once per sub-chunk
+        current_parts = []
+        current_size = 0
+        current_offset = 0
         
-        current_text = ""
-        for para in paragraphs:
-            if len(current_text) + len(para) <= self.max_chunk_size:
-                current_text += para + "\n\n"
-            else:
-                if current_text:
-                    sub_chunk = self._create_chunk(
-                        current_text,
-                        chunk.pages,  # Keep same page references
-                        chunk.start_page,
-                        chunk.start_char + len(current_text),
-                        'overflow',
-                        chunk.section_headers
-                    )
-                    sub_chunks.append(sub_chunk)
-                current_text = para + "\n\n"
+        for piece_offset, piece in self._split_pieces(text):
+            piece_size = self.measure(piece)
+            
+            if current_parts and current_size + piece_size > self.max_size:
+                sub_chunks.append(self._create_chunk(
+                    "\n\n".join(current_parts),
+                    chunk.pages,  # Keep same page references
+                    chunk.start_page,
+                    chunk.start_char + current_offset,
+                    'overflow',
+                    chunk.section_headers,
+                    chunk.page_hashes
+                ))
+                current_parts = []
+                current_size = 0
+            
+            if not current_parts:
+                current_offset = piece_offset
+            current_parts.append(piece)
+            current_size += piece_size + self.measure("\n\n")
         
         # Add remaining text
-        if current_text:
-            sub_chunk = self._create_chunk(
-                current_text,
+        if current_parts:
+            sub_chunks.append(self._create_chunk(
+                "\n\n".join(current_parts),
                 chunk.pages,
                 chunk.start_page,
-                chunk.start_char + len(text) - len(current_text),
+                chunk.start_char + current_offset,
                 'overflow',
-                chunk.section_headers
-            )
-            sub_chunks.append(sub_chunk)
+                chunk.section_headers,
+                chunk.page_hashes
+            ))
         
         return sub_chunks if sub_chunks else [chunk]
+    
+    def _split_pieces(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Paragraphs of text with their offsets. In token mode, paragraphs over
+        the budget are broken at sentences, then at whitespace, and as a last
+        resort every few characters, so every piece fits.
+        """
+        pieces = []
+        offset = 0
+        for match in self.paragraph_pattern.finditer(text + "\n\n"):
+            pieces.append((offset, text[offset:match.start()]))
+            offset = match.end()
+        
+        if not self.token_mode:
+            return pieces
+        
+        fitted = []
+        for offset, piece in pieces:
+            if self.measure(piece) <= self.max_size:
+                fitted.append((offset, piece))
+                continue
+            for pattern in (self.sentence_pattern, re.compile(r'\s+'), re.compile(r'.{1,16}', re.DOTALL)):
+                parts = self._pack_at(piece, pattern)
+                if all(self.measure(part) <= self.max_size for _, part in parts):
+                    break
+            fitted.extend((offset + part_offset, part) for part_offset, part in parts)
+        return fitted
+    
+    def _pack_at(self, text: str, pattern) -> List[Tuple[int, str]]:
+        """Greedily pack text into budget-sized parts, cutting only after pattern matches"""
+        cuts = [match.end() for match in pattern.finditer(text)] + [len(text)]
+        parts = []
+        start = 0
+        end = 0
+        for cut in cuts:
+            if end > start and self.measure(text[start:cut]) > self.max_size:
+                parts.append((start, text[start:end]))
+                start = end
+            end = cut
+        if start < len(text):
+            parts.append((start, text[start:]))
+        return parts
 
 
-def chunk_document(pdf_path: str, max_chunk_size: int = 15000) -> List[DocumentChunk]:
+def chunk_document(pdf_path: str, max_chunk_size: int = 15000,
+                   max_chunk_tokens: Optional[int] = None,
+                   model: Optional[str] = None) -> List[DocumentChunk]:
     """
     Convenience function to chunk a PDF document
     
     Args:
         pdf_path: Path to PDF document
         max_chunk_size: Maximum chunk size
+        max_chunk_tokens: Optional token budget per chunk (token mode)
+        model: Optional LLM model to take the token budget from
     
     Returns:
         List of document chunks
@@ -474,7 +687,7 @@ def chunk_document(pdf_path: str, max_chunk_size: int = 15000) -> List[DocumentC
     full_text, pages = processor.extract_text_from_pdf(pdf_path)
     
     # Create chunks
-    chunker = SmartChunker(max_chunk_size=max_chunk_size)
+    chunker = SmartChunker(max_chunk_size=max_chunk_size, max_chunk_tokens=max_chunk_tokens, model=model)
     chunks = chunker.chunk_document(pages)
     
     return chunks
@@ -10,7 +10,7 @@ from pathlib import Path
 from typing import List, Dict, Tuple
 import statistics
 
-from performance_optimizer import RAGPerformanceOptimizer, optimize_document_processing
+from performance_optimizer import RAGPerformanceOptimizer, BatchProcessor, optimize_document_processing
 from cache_manager import CacheManager
 from rag_processor import RAGTrustProcessor
 
@@ -314,6 +314,58 @@ def test_parallel_processing():
     return results
 
 
+def test_fact_extraction_parallelism():
+    """Compare thread-pool and process-pool fact extraction"""
+    print("\n" + "="*80)
+    print("FACT EXTRACTION: THREADS VS PROCESSES")
+    print("="*80)
+    
+    test_file = "data/Jerry Simons Trust.pdf"  # Large document
+    if not Path(test_file).exists():
+        test_file = "data/2006 Eric Russell ILIT.pdf"  # Fallback
+        
+    if not Path(test_file).exists():
+        print(f"❌ No test files found")
+        return None
+    
+    print(f"📄 Testing with: {Path(test_file).name}")
+    
+    from pdf_processor import PDFProcessor
+    from smart_chunker import SmartChunker
+    
+    _, pages = PDFProcessor().extract_text_from_pdf(test_file)
+    chunks = SmartChunker().chunk_document(pages)
+    print(f"  - {len(pages)} pages, {len(chunks)} chunks")
+    
+    workers = 4
+    processor = BatchProcessor(max_workers=workers)
+    
+    thread_time, thread_facts = measure_processing_time(
+        processor.parallel_fact_extraction, chunks, use_processes=False
+    )
+    process_time, process_facts = measure_processing_time(
+        processor.parallel_fact_extraction, chunks, use_processes=True
+    )
+    
+    identical = [f.to_dict() for f in thread_facts] == [f.to_dict() for f in process_facts]
+    speedup = thread_time / max(0.001, process_time)
+    
+    print(f"\n⚙️  {workers} workers:")
+    print(f"  - Threads: {thread_time:.2f}s ({len(thread_facts)} facts)")
+    print(f"  - Processes: {process_time:.2f}s ({len(process_facts)} facts)")
+    print(f"  - Speedup: {speedup:.1f}x")
+    print(f"  - Identical output: {'Yes' if identical else 'No'}")
+    
+    return {
+        'workers': workers,
+        'chunks': len(chunks),
+        'thread_time': thread_time,
+        'process_time': process_time,
+        'speedup': speedup,
+        'identical_output': identical
+    }
+
+
 def generate_performance_report(test_results: Dict):
     """Generate comprehensive performance report"""
     print("\n" + "="*80)
@@ -361,6 +413,17 @@ def generate_performance_report(test_results: Dict):
                 'memory_usage_mb': caching_results.get('cache_stats', {}).get('memory_cache', {}).get('storage_mb', 0)
             }
     
+    # Fact extraction parallelism
+    if 'fact_extraction' in test_results:
+        extraction_results = test_results['fact_extraction']
+        if extraction_results:
+            report['summary']['fact_extraction'] = {
+                'thread_time': extraction_results.get('thread_time', 0),
+                'process_time': extraction_results.get('process_time', 0),
+                'speedup': extraction_results.get('speedup', 1),
+                'identical_output': extraction_results.get('identical_output', False)
+            }
+    
     # Print summary
     print("\n🎯 KEY PERFORMANCE IMPROVEMENTS:")
     
@@ -382,6 +445,12 @@ def generate_performance_report(test_results: Dict):
         print(f"    - Hit rate: {cache['hit_rate']:.1%}")
         print(f"    - Memory usage: {cache['memory_usage_mb']:.1f}MB")
     
+    if 'fact_extraction' in report['summary']:
+        extraction = report['summary']['fact_extraction']
+        print(f"  • Process-pool fact extraction: {extraction['speedup']:.1f}x faster than threads")
+        print(f"    - Threads: {extraction['thread_time']:.2f}s → Processes: {extraction['process_time']:.2f}s")
+        print(f"    - Identical output: {'Yes' if extraction['identical_output'] else 'No'}")
+    
     # Save report
     report_path = Path("results/performance_optimization_report.json")
     with open(report_path, 'w') as f:
@@ -426,6 +495,13 @@ def main():
     except Exception as e:
         print(f"❌ Parallel processing test failed: {e}")
     
+    # Test 5: Fact extraction threads vs processes
+    try:
+        extraction_results = test_fact_extraction_parallelism()
+        test_results['fact_extraction'] = extraction_results
+    except Exception as e:
+        print(f"❌ Fact extraction parallelism test failed: {e}")
+    
     # Generate comprehensive report
     report = generate_performance_report(test_results)
     
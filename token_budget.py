@@ -0,0 +1,53 @@
+"""
+Token Budget - Local token estimates and per-model prompt budgets for chunking
+"""
+
+import math
+from typing import Callable, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough characters per token for English legal prose
+CHARS_PER_TOKEN = 4.0
+
+# Document tokens packed into a single chunk prompt, per model. These sit well
+# under each context window to leave room for instructions and the JSON reply.
+MODEL_CHUNK_TOKEN_BUDGETS = {
+    'claude-3-5-sonnet-20241022': 30000,
+    'claude-3-haiku-20240307': 30000,
+    'gpt-4o': 24000,
+}
+DEFAULT_CHUNK_TOKEN_BUDGET = 8000
+
+
+def estimate_tokens_by_chars(text: str) -> int:
+    """Cheap token estimate from character count"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def get_token_estimator(model: Optional[str] = None) -> Callable[[str], int]:
+    """
+    Get a local token counter for a model. Uses tiktoken when it is installed
+    (exact for OpenAI models, a close estimate for Claude), otherwise falls back
+    to the character-based estimate.
+    """
+    if tiktoken is not None:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception as e:
+            # Encodings are downloaded on first use; offline machines fall back
+            print(f"⚠️ tiktoken unavailable, estimating tokens from characters: {e}")
+
+    return estimate_tokens_by_chars
+
+
+def get_chunk_token_budget(model: Optional[str] = None) -> int:
+    """Document tokens to pack into one chunk for the given model"""
+    return MODEL_CHUNK_TOKEN_BUDGETS.get(model, DEFAULT_CHUNK_TOKEN_BUDGET)
@@ -5,28 +5,190 @@ Vector Store - Semantic search and retrieval for document facts
 import os
 import json
 import hashlib
-from typing import List, Dict, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Callable
 from pathlib import Path
 import chromadb
 from chromadb.config import Settings
+from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
+from chromadb.utils import embedding_functions
 from semantic_extractor import Fact
+from cache_manager import CacheManager
 import numpy as np
 
+# Texts sent to the embedding model per call
+EMBEDDING_BATCH_SIZE = 64
+
+# Ids per Chroma get/upsert call, under the client's maximum batch size
+INDEX_BATCH_SIZE = 1000
+
+# Model behind Chroma's default embedding function; part of every cache key
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Embedding model for the current worker process, see CachedEmbeddingFunction
+_worker_embed_fn = None
+
+
+def _init_embedding_worker(embed_fn: Callable[[List[str]], List]):
+    """Pool initializer: receive the embedding model once per worker"""
+    global _worker_embed_fn
+    _worker_embed_fn = embed_fn
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    """Embed one batch in a worker process"""
+    return np.asarray(_worker_embed_fn(texts), dtype=np.float32)
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """
+    Explicit embedding layer for the vector store.
+    
+    Texts are looked up by content hash in the CacheManager first; only the
+    misses are embedded, in batches of batch_size, optionally spread over a
+    thread or process pool. Vectors are computed and cached as float32 and
+    handed to Chroma as plain lists, so re-indexing an unchanged document
+    computes no embeddings at all.
+    """
+    
+    def __init__(self, embed_fn: Callable[[List[str]], List] = None,
+                 cache_manager: Optional[CacheManager] = None,
+                 model_name: str = DEFAULT_EMBEDDING_MODEL,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_workers: int = 1, use_processes: bool = False):
+        """
+        Initialize embedding function
+        
+        Args:
+            embed_fn: Model mapping a list of texts to vectors; defaults to
+                Chroma's built-in model
+            cache_manager: Cache for vectors keyed by content hash
+            model_name: Name of the model behind embed_fn, part of the cache key
+            batch_size: Texts per model call
+            max_workers: Pool size for embedding batches; 1 embeds inline
+            use_processes: Use a process pool instead of threads (embed_fn
+                must be picklable)
+        """
+        self.embed_fn = embed_fn or embedding_functions.DefaultEmbeddingFunction()
+        self.cache_manager = cache_manager
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        
+        self.lock = threading.Lock()
+        self.texts_computed = 0
+        self.texts_reused = 0
+    
+    def _text_hash(self, text: str) -> str:
+        """Cache key for a text under this model"""
+        return hashlib.md5(f"{self.model_name}\x00{text}".encode()).hexdigest()
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        hashes = [self._text_hash(text) for text in texts]
+        
+        vectors = {}
+        if self.cache_manager is not None:
+            vectors = self.cache_manager.get_embeddings_batch(list(dict.fromkeys(hashes)))
+        
+        pending = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in vectors and text_hash not in pending:
+                pending[text_hash] = text
+        
+        if pending:
+            computed = self.embed_texts(list(pending.values()))
+            new_vectors = dict(zip(pending, computed))
+            if self.cache_manager is not None:
+                self.cache_manager.cache_embeddings_batch(new_vectors)
+            vectors.update(new_vectors)
+        
+        with self.lock:
+            self.texts_computed += len(pending)
+            self.texts_reused += len(texts) - len(pending)
+        
+        # Plain lists at the Chroma boundary: older chromadb validators reject ndarrays
+        return [vectors[text_hash].tolist() for text_hash in hashes]
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with the model, bypassing the cache
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            float32 array of shape (len(texts), dimensions)
+        """
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        
+        if self.max_workers <= 1 or len(batches) == 1:
+            results = [np.asarray(self.embed_fn(batch), dtype=np.float32) for batch in batches]
+        elif self.use_processes:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(batches)),
+                                     initializer=_init_embedding_worker,
+                                     initargs=(self.embed_fn,)) as executor:
+                results = list(executor.map(_embed_batch, batches))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                results = list(executor.map(
+                    lambda batch: np.asarray(self.embed_fn(batch), dtype=np.float32), batches))
+        
+        return np.vstack(results)
+    
+    def get_stats(self) -> Dict:
+        """Texts embedded by the model versus reused from cache or the same call"""
+        return {
+            'texts_computed': self.texts_computed,
+            'texts_reused': self.texts_reused,
+            'model_name': self.model_name,
+            'batch_size': self.batch_size
+        }
+
+
+_default_embedding_function = None
+_default_embedding_lock = threading.Lock()
+
+
+def get_default_embedding_function() -> CachedEmbeddingFunction:
+    """
+    Process-wide embedding function backed by the on-disk cache, shared by
+    every DocumentVectorStore that is not given its own
+    """
+    global _default_embedding_function
+    with _default_embedding_lock:
+        if _default_embedding_function is None:
+            try:
+                cache_manager = CacheManager()
+            except Exception as e:
+                print(f"⚠️ Embedding cache unavailable, embeddings will not be reused: {e}")
+                cache_manager = None
+            _default_embedding_function = CachedEmbeddingFunction(cache_manager=cache_manager)
+        return _default_embedding_function
+
 
 class DocumentVectorStore:
     """Vector database for semantic search of document facts"""
     
     def __init__(self, collection_name: str = "trust_facts", 
-                 persist_directory: str = "vector_db"):
+                 persist_directory: str = "vector_db",
+                 embedding_function: CachedEmbeddingFunction = None):
         """
         Initialize vector store
         
         Args:
             collection_name: Name of the collection
             persist_directory: Directory to persist the database
+            embedding_function: Embedding layer; defaults to the shared,
+                cached one from get_default_embedding_function()
         """
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(exist_ok=True)
+        self.embedding_function = embedding_function or get_default_embedding_function()
         
         # Initialize ChromaDB client with persistence
         self.client = chromadb.PersistentClient(
@@ -39,38 +201,43 @@ class DocumentVectorStore:
         
         # Get or create collection
         try:
-            self.collection = self.client.get_collection(collection_name)
+            self.collection = self.client.get_collection(
+                collection_name,
+                embedding_function=self.embedding_function
+            )
             print(f"✓ Loaded existing collection: {collection_name}")
         except:
             self.collection = self.client.create_collection(
                 name=collection_name,
-                metadata={"description": "Trust document facts"}
+                metadata={"description": "Trust document facts"},
+                embedding_function=self.embedding_function
             )
             print(f"✓ Created new collection: {collection_name}")
     
     def index_facts(self, facts: List[Fact], document_id: str = None) -> int:
         """
-        Index facts into the vector store
+        Upsert facts into the vector store, skipping facts already indexed
+        with identical content
         
         Args:
             facts: List of facts to index
-            document_id: Optional document identifier
+            document_id: Optional document identifier; ids are scoped to it
         
         Returns:
-            Number of facts indexed
+            Number of new or changed facts written
         """
         if not facts:
             return 0
         
-        # Prepare data for indexing
-        documents = []
-        metadatas = []
-        ids = []
-        
+        # Prepare data for indexing, one entry per id
+        entries = {}
         for fact in facts:
+            entry_id = self._entry_id(fact, document_id)
+            if entry_id in entries:
+                continue
+            
             # Create searchable document text
             doc_text = f"{fact.fact}\n\nContext: {fact.context}"
-            documents.append(doc_text)
             
             # Prepare metadata
             metadata = {
@@ -85,27 +252,97 @@ class DocumentVectorStore:
             if document_id:
                 metadata["document_id"] = document_id
             
-            metadatas.append(metadata)
+            # Fingerprint of everything stored, to detect unchanged facts
+            metadata["content_hash"] = hashlib.md5(
+                (doc_text + json.dumps(metadata, sort_keys=True)).encode()
+            ).hexdigest()
             
-            # Use fact_id or generate one
-            fact_id = fact.fact_id or hashlib.md5(
-                f"{fact.fact}_{fact.page}".encode()
-            ).hexdigest()[:16]
-            ids.append(fact_id)
+            entries[entry_id] = (doc_text, metadata)
         
-        # Add to collection
         try:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            print(f"✓ Indexed {len(facts)} facts")
-            return len(facts)
+            existing = self._get_content_hashes(list(entries))
+            changed = [entry_id for entry_id, (_, metadata) in entries.items()
+                       if existing.get(entry_id) != metadata["content_hash"]]
+            
+            for i in range(0, len(changed), INDEX_BATCH_SIZE):
+                batch = changed[i:i + INDEX_BATCH_SIZE]
+                self.collection.upsert(
+                    documents=[entries[entry_id][0] for entry_id in batch],
+                    metadatas=[entries[entry_id][1] for entry_id in batch],
+                    ids=batch
+                )
+            
+            print(f"✓ Indexed {len(changed)} facts ({len(entries) - len(changed)} unchanged)")
+            return len(changed)
         except Exception as e:
             print(f"⚠️ Error indexing facts: {e}")
             return 0
     
+    def _entry_id(self, fact: Fact, document_id: str = None) -> str:
+        """Collection id of a fact, scoped to its document"""
+        # Use fact_id or generate one
+        fact_id = fact.fact_id or hashlib.md5(
+            f"{fact.fact}_{fact.page}".encode()
+        ).hexdigest()[:16]
+        return f"{document_id}:{fact_id}" if document_id else fact_id
+    
+    def _get_content_hashes(self, ids: List[str]) -> Dict[str, str]:
+        """content_hash of each id already in the collection"""
+        hashes = {}
+        for i in range(0, len(ids), INDEX_BATCH_SIZE):
+            existing = self.collection.get(ids=ids[i:i + INDEX_BATCH_SIZE], include=["metadatas"])
+            for entry_id, metadata in zip(existing['ids'], existing['metadatas']):
+                if metadata and metadata.get("content_hash"):
+                    hashes[entry_id] = metadata["content_hash"]
+        return hashes
+    
+    def replace_document_facts(self, facts: List[Fact], document_id: str) -> int:
+        """
+        Make the indexed facts of one document match the given facts:
+        new or changed facts are upserted and facts no longer extracted are
+        deleted, leaving other documents untouched
+        
+        Args:
+            facts: Current facts of the document
+            document_id: Document identifier
+        
+        Returns:
+            Number of new or changed facts written
+        """
+        count = self.index_facts(facts, document_id)
+        
+        try:
+            current = {self._entry_id(fact, document_id) for fact in facts}
+            indexed = self.collection.get(where={"document_id": document_id}, include=[])
+            stale = [entry_id for entry_id in indexed['ids'] if entry_id not in current]
+            if stale:
+                self.collection.delete(ids=stale)
+                print(f"✓ Removed {len(stale)} stale facts for {document_id}")
+        except Exception as e:
+            print(f"⚠️ Error removing stale facts: {e}")
+        
+        return count
+    
+    def delete_document(self, document_id: str) -> int:
+        """
+        Remove every fact of one document from the collection
+        
+        Args:
+            document_id: Document identifier
+        
+        Returns:
+            Number of facts removed
+        """
+        try:
+            indexed = self.collection.get(where={"document_id": document_id}, include=[])
+            if indexed['ids']:
+                self.collection.delete(ids=indexed['ids'])
+            print(f"✓ Removed {len(indexed['ids'])} facts for {document_id}")
+            return len(indexed['ids'])
+        except Exception as e:
+            print(f"⚠️ Error deleting document: {e}")
+            return 0
+    
     def semantic_search(self, query: str, top_k: int = 10, 
                        filters: Dict = None) -> List[Dict]:
         """
@@ -123,12 +360,15 @@ class DocumentVectorStore:
             # Build where clause from filters
             where = None
             if filters:
-                where = {}
+                conditions = []
                 for key, value in filters.items():
                     if isinstance(value, list):
-                        where[key] = {"$in": value}
+                        conditions.append({key: {"$in": value}})
                     else:
-                        where[key] = value
+                        conditions.append({key: value})
+                
+                # Chroma takes one condition per clause; combine several with $and
+                where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
             
             # Perform search
             results = self.collection.query(
@@ -269,7 +509,8 @@ class DocumentVectorStore:
             self.client.delete_collection(self.collection.name)
             self.collection = self.client.create_collection(
                 name=self.collection.name,
-                metadata={"description": "Trust document facts"}
+                metadata={"description": "Trust document facts"},
+                embedding_function=self.embedding_function
             )
             print("✓ Collection cleared")
         except Exception as e:
@@ -292,7 +533,8 @@ class DocumentVectorStore:
                 'total_facts': count,
                 'fact_types': fact_types,
                 'collection_name': self.collection.name,
-                'persist_directory': str(self.persist_directory)
+                'persist_directory': str(self.persist_directory),
+                'embeddings': self.embedding_function.get_stats()
             }
         except Exception as e:
             print(f"⚠️ Error getting stats: {e}")
@@ -323,7 +565,7 @@ def index_document_facts(pdf_path: str, vector_store: DocumentVectorStore = None
     doc_id = Path(pdf_path).stem
     
     # Index facts
-    count = vector_store.index_facts(facts, document_id=doc_id)
+    count = vector_store.replace_document_facts(facts, document_id=doc_id)
     
     return count
 